@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Synthetic database generator for the load tests and benchmarks
+
+Creates a fresh SQLite database and fills it with seed.generate_dataset
+(the same generator as `flask seed`). Every school gets an admin
+(admin_s<n>), a school manager (manager_s<n>) and --users-per-school users
+(user_s<n>_<i>), all with the password given by --password. The same
+--seed always produces the same rows.
+
+Usage:
+    python benchmarks/generate_data.py --database /tmp/loadtest.db \\
+        [--schools 10] [--users-per-school 20] [--items 500] [--requests 20000]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--database', required=True, help='SQLite file to create')
+    parser.add_argument('--schools', type=int, default=10)
+    parser.add_argument('--users-per-school', type=int, default=20)
+    parser.add_argument('--items', type=int, default=500)
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--comments', type=float, default=0.3, help='chance of a user comment per request')
+    parser.add_argument('--days', type=int, default=365, help='spread request history over this many days')
+    parser.add_argument('--password', default='loadtest')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    if os.path.exists(args.database):
+        parser.error(f'{args.database} already exists')
+    os.environ['DATABASE_URL'] = f'sqlite:///{os.path.abspath(args.database)}'
+    os.environ.setdefault('FLASK_ENV', 'production')
+
+    from app import create_app
+    from database import init_database
+    from seed import generate_dataset
+
+    app = create_app(os.environ['FLASK_ENV'])
+    started = time.perf_counter()
+    with app.app_context():
+        init_database()
+        counts = generate_dataset(
+            schools=args.schools, users_per_school=args.users_per_school, items=args.items,
+            requests=args.requests, comments_per_request=args.comments, days=args.days,
+            password=args.password, seed=args.seed
+        )
+
+    print(', '.join(f'{count} {table}' for table, count in counts.items())
+          + f' rows in {time.perf_counter() - started:.1f}s -> {args.database}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Index migration benchmark
+
+Loads the same synthetic requests into a scratch SQLite database at the
+baseline schema (revision 0001) and at the audited index set (head), and
+reports insert throughput and report latency for each, so an index change
+can be judged on both its write cost and its read benefit.
+
+Usage:
+    python benchmarks/index_migration.py [--requests 20000] [--repeat 5] [--json results.json]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+DB_PATH = os.path.join(tempfile.mkdtemp(prefix='index-bench-'), 'bench.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{DB_PATH}'
+
+from flask_migrate import upgrade, downgrade
+from sqlalchemy import text
+from app import create_app
+from extensions import db
+from models import User, Inventory, Request, RequestItem
+from lookups import schools, categories
+
+REPORT_URLS = [
+    '/reports',
+    '/reports/analytics',
+    '/reports/daily-transactions',
+    '/reports/stock-report',
+    '/reports/sales-report',
+    '/reports/pending-report',
+    '/reports/user-summary',
+    '/reports/inventory-sales-summary',
+    '/reports/export/requests',
+]
+STATUSES = ['pending', 'approved', 'rejected', 'fulfilled']
+CATEGORIES = ['Stationery', 'Electronics', 'Furniture', 'Cleaning', 'Sports']
+
+
+def reset_data():
+    for model in (RequestItem, Request, Inventory):
+        db.session.query(model).delete()
+    db.session.query(User).filter(User.role != 'super_admin').delete()
+    db.session.commit()
+    db.session.execute(text('VACUUM'))
+
+
+def seed_reference_data(rng, users=200, items=500):
+    school_ids = [schools.id_for(f'School {i}', create=True) for i in range(20)]
+    category_ids = [categories.id_for(name, create=True) for name in CATEGORIES]
+    db.session.add_all(
+        User(username=f'user{i}', email=f'user{i}@school.com', role='user',
+             school_id=school_ids[i % 20], password_hash='x')
+        for i in range(users)
+    )
+    db.session.add_all(
+        Inventory(name=f'Item {i}', category_id=rng.choice(category_ids),
+                  quantity=rng.randint(0, 200), cost=round(rng.uniform(1, 500), 2))
+        for i in range(items)
+    )
+    db.session.commit()
+    user_ids = [u for (u,) in db.session.query(User.id).filter(User.role == 'user')]
+    item_ids = [i for (i,) in db.session.query(Inventory.id)]
+    return user_ids, item_ids
+
+
+def insert_requests(rng, count, user_ids, item_ids, batch=500):
+    """Insert requests with 2-3 items each through the ORM; return rows/second"""
+    now = datetime.utcnow()
+    rows = 0
+    started = time.perf_counter()
+    for offset in range(0, count, batch):
+        for _ in range(min(batch, count - offset)):
+            request = Request(user_id=rng.choice(user_ids), status=rng.choice(STATUSES),
+                              created_at=now - timedelta(minutes=rng.randint(0, 525600)))
+            for inventory_id in rng.sample(item_ids, rng.randint(2, 3)):
+                request.items.append(RequestItem(inventory_id=inventory_id, quantity=rng.randint(1, 5),
+                                                 cost=round(rng.uniform(1, 500), 2)))
+                rows += 1
+            db.session.add(request)
+            rows += 1
+        db.session.commit()
+    return round(rows / (time.perf_counter() - started))
+
+
+def time_reports(app, admin_id, repeat):
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(admin_id)
+        sess['_fresh'] = True
+
+    latencies = {}
+    for url in REPORT_URLS:
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            try:
+                response = client.get(url)
+            except Exception:
+                break
+            if response.status_code != 200:
+                break
+            samples.append((time.perf_counter() - started) * 1000)
+        latencies[url] = round(statistics.median(samples), 1) if len(samples) == repeat else None
+    return latencies
+
+
+def run_variant(app, revision, args):
+    reset_data()
+    if revision == 'head':
+        upgrade()
+    else:
+        downgrade(revision=revision)
+    rng = random.Random(args.seed)
+    user_ids, item_ids = seed_reference_data(rng)
+    rows_per_second = insert_requests(rng, args.requests, user_ids, item_ids)
+    db.session.execute(text('ANALYZE'))
+    admin_id = User.query.filter_by(role='super_admin').first().id
+    return {
+        'revision': revision,
+        'indexes': db.session.execute(text(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'index'"
+        )).scalar(),
+        'insert_rows_per_second': rows_per_second,
+        'report_ms': time_reports(app, admin_id, args.repeat),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=20000, help='requests to insert per variant')
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per report (median is kept)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', help='write results to this file')
+    args = parser.parse_args()
+
+    app = create_app('development')
+    with app.app_context():
+        results = [run_variant(app, revision, args) for revision in ('0001', 'head')]
+
+    baseline, head = results
+    print(f"{'':<36}{'0001':>12}{'head':>12}")
+    print(f"{'indexes':<36}{baseline['indexes']:>12}{head['indexes']:>12}")
+    print(f"{'insert rows/s':<36}{baseline['insert_rows_per_second']:>12}{head['insert_rows_per_second']:>12}")
+    for url in REPORT_URLS:
+        before, after = baseline['report_ms'][url], head['report_ms'][url]
+        print(f"{url + ' (ms)':<36}{str(before):>12}{str(after):>12}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
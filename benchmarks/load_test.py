@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Load test for the core user journeys
+
+Virtual users log in and loop over the request journey:
+    users:  /inventory -> add-to-cart (1-3 items) -> submit-request
+    admins: /admin/requests -> approve a pending request -> a report -> an export
+and the per-endpoint p50/p95/p99 latency, throughput and error counts are
+written to a JSON baseline. With --compare the run fails (exit 1) when an
+endpoint's p95 is more than --tolerance slower than in the baseline.
+
+Prepare a database with benchmarks/generate_data.py, then either point the
+test at a running server or let it start gunicorn itself:
+
+    python benchmarks/generate_data.py --database /tmp/loadtest.db
+    python benchmarks/load_test.py --spawn --database /tmp/loadtest.db \\
+        --users 20 --admins 2 --duration 60 --json baseline.json
+
+Requires httpx (pip install -r benchmarks/requirements.txt).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+import httpx
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+CSRF_TOKEN = re.compile(r'name="csrf_token" type="hidden" value="([^"]+)"')
+ITEM_ID = re.compile(r'data-item-id="(\d+)"')
+PENDING_REQUEST = re.compile(r'<tr data-request-id="(\d+)">(?:(?!</tr>).)*?status-badge status-pending"', re.S)
+REQUEST_ID = re.compile(r'<tr data-request-id="(\d+)">')
+
+REPORTS = [
+    '/reports',
+    '/reports/analytics',
+    '/reports/daily-transactions',
+    '/reports/stock-report',
+    '/reports/sales-report',
+    '/reports/pending-report',
+    '/reports/user-summary',
+    '/reports/inventory-sales-summary',
+]
+EXPORTS = [
+    '/reports/export/requests',
+    '/reports/export/inventory',
+    '/reports/export/all',
+]
+
+
+class Recorder:
+    """Latency samples and error counts per endpoint label"""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    async def call(self, client, label, method, url, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.errors[label] += 1
+            return None
+        self.samples[label].append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            self.errors[label] += 1
+        return response
+
+    def summary(self, elapsed):
+        endpoints = {}
+        for label in sorted(set(self.samples) | set(self.errors)):
+            samples = sorted(self.samples[label])
+            endpoints[label] = {
+                'count': len(samples),
+                'errors': self.errors[label],
+                'throughput_rps': round(len(samples) / elapsed, 2),
+                'p50_ms': percentile(samples, 50),
+                'p95_ms': percentile(samples, 95),
+                'p99_ms': percentile(samples, 99),
+            }
+        return endpoints
+
+
+def percentile(samples, pct):
+    if not samples:
+        return None
+    index = min(len(samples) - 1, max(0, round(pct / 100 * len(samples)) - 1))
+    return round(samples[index] * 1000, 1)
+
+
+async def login(client, recorder, username, password):
+    page = await recorder.call(client, 'GET /login', 'GET', '/login')
+    token = CSRF_TOKEN.search(page.text) if page is not None else None
+    data = {'username': username, 'password': password}
+    if token:
+        data['csrf_token'] = token.group(1)
+    response = await recorder.call(client, 'POST /login', 'POST', '/login', data=data)
+    return response is not None and response.status_code == 302
+
+
+async def user_journey(client, recorder, rng, deadline):
+    while time.monotonic() < deadline:
+        page = await recorder.call(client, 'GET /inventory', 'GET', '/inventory')
+        item_ids = ITEM_ID.findall(page.text) if page is not None else []
+        if not item_ids:
+            continue
+        for item_id in rng.sample(item_ids, min(len(item_ids), rng.randint(1, 3))):
+            await recorder.call(client, 'POST /add-to-cart', 'POST', '/add-to-cart',
+                                data={'item_id': item_id, 'quantity': 1})
+        await recorder.call(client, 'POST /submit-request', 'POST', '/submit-request')
+        client.cookies.delete('cart')
+
+
+async def admin_journey(client, recorder, rng, deadline):
+    while time.monotonic() < deadline:
+        page = await recorder.call(client, 'GET /admin/requests', 'GET', '/admin/requests')
+        if page is not None:
+            request_ids = PENDING_REQUEST.findall(page.text) or REQUEST_ID.findall(page.text)
+            if request_ids:
+                request_id = rng.choice(request_ids[:50])
+                await recorder.call(client, 'GET /admin/request/<id>/approve', 'GET',
+                                    f'/admin/request/{request_id}/approve')
+        report = rng.choice(REPORTS)
+        await recorder.call(client, f'GET {report}', 'GET', report)
+        export = rng.choice(EXPORTS)
+        await recorder.call(client, f'GET {export}', 'GET', export)
+
+
+async def virtual_user(base_url, recorder, username, password, journey, seed, deadline, timeout):
+    rng = random.Random(seed)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, follow_redirects=False) as client:
+        if not await login(client, recorder, username, password):
+            print(f'login failed for {username}', file=sys.stderr)
+            return
+        await journey(client, recorder, rng, deadline)
+
+
+async def run(args):
+    recorder = Recorder()
+    deadline = time.monotonic() + args.duration
+    tasks = []
+    for i in range(args.users):
+        school = i % args.schools + 1
+        username = f'user_s{school}_{i // args.schools % args.users_per_school + 1}'
+        tasks.append(virtual_user(args.base_url, recorder, username, args.password,
+                                  user_journey, args.seed + i, deadline, args.timeout))
+    for i in range(args.admins):
+        tasks.append(virtual_user(args.base_url, recorder, f'admin_s{i % args.schools + 1}', args.password,
+                                  admin_journey, args.seed + 10000 + i, deadline, args.timeout))
+    started = time.monotonic()
+    await asyncio.gather(*tasks)
+    return recorder.summary(time.monotonic() - started)
+
+
+def spawn_server(args):
+    env = dict(os.environ,
+               FLASK_ENV='production',
+               DATABASE_URL=f'sqlite:///{os.path.abspath(args.database)}',
+               MAIL_SUPPRESS_SEND='true',
+               SESSION_COOKIE_SECURE='false')
+    command = [sys.executable, '-m', 'gunicorn', '--config', os.path.join(ROOT, 'gunicorn.conf.py'),
+               '--bind', args.base_url.split('//', 1)[1], '--pythonpath', ROOT,
+               '--workers', str(args.workers), '--worker-class', args.worker_class, '--threads', str(args.threads)]
+    command += args.gunicorn_args + ['wsgi:app']
+    # Run from a scratch directory so the server's logs/ stay out of the tree
+    workdir = tempfile.mkdtemp(prefix='loadtest-')
+    log = open(os.path.join(workdir, 'gunicorn.log'), 'w')
+    print(f'gunicorn output: {log.name}')
+    server = subprocess.Popen(command, cwd=workdir, env=env, stdout=log, stderr=subprocess.STDOUT)
+    for _ in range(100):
+        try:
+            if httpx.get(f'{args.base_url}/livez', timeout=1).status_code == 200:
+                return server
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    server.terminate()
+    raise SystemExit('gunicorn did not come up')
+
+
+def compare(endpoints, baseline_path, tolerance):
+    with open(baseline_path) as f:
+        baseline = json.load(f)['endpoints']
+    regressions = []
+    for label, stats in endpoints.items():
+        before = baseline.get(label, {}).get('p95_ms')
+        if before and stats['p95_ms'] and stats['p95_ms'] > before * (1 + tolerance):
+            regressions.append(f'{label}: p95 {before} ms -> {stats["p95_ms"]} ms')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--base-url', default='http://127.0.0.1:8050')
+    parser.add_argument('--spawn', action='store_true', help='start gunicorn on --base-url for the run')
+    parser.add_argument('--database', help='SQLite file served by the spawned gunicorn')
+    parser.add_argument('--workers', type=int, default=4, help='gunicorn workers when spawning')
+    parser.add_argument('--worker-class', default='gthread', help='gunicorn worker class when spawning (sync, gthread, gevent)')
+    parser.add_argument('--threads', type=int, default=8, help='threads per gthread worker when spawning')
+    parser.add_argument('--gunicorn-args', nargs=argparse.REMAINDER, default=[],
+                        help='extra gunicorn arguments when spawning (must come last)')
+    parser.add_argument('--users', type=int, default=20, help='concurrent regular users')
+    parser.add_argument('--admins', type=int, default=2, help='concurrent admins')
+    parser.add_argument('--schools', type=int, default=10, help='as passed to generate_data.py')
+    parser.add_argument('--users-per-school', type=int, default=20, help='as passed to generate_data.py')
+    parser.add_argument('--password', default='loadtest')
+    parser.add_argument('--duration', type=float, default=60, help='seconds to run')
+    parser.add_argument('--timeout', type=float, default=30, help='per-request timeout in seconds')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', help='write the results to this file')
+    parser.add_argument('--compare', help='baseline JSON to compare p95 latencies against')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed p95 slowdown (0.25 = 25%%)')
+    args = parser.parse_args()
+    if args.spawn and not args.database:
+        parser.error('--spawn needs --database')
+
+    server = spawn_server(args) if args.spawn else None
+    try:
+        endpoints = asyncio.run(run(args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    print(f"{'endpoint':<42}{'count':>7}{'err':>6}{'rps':>8}{'p50':>9}{'p95':>9}{'p99':>9}")
+    for label, stats in endpoints.items():
+        print(f"{label:<42}{stats['count']:>7}{stats['errors']:>6}{stats['throughput_rps']:>8}"
+              f"{str(stats['p50_ms']):>9}{str(stats['p95_ms']):>9}{str(stats['p99_ms']):>9}")
+
+    if args.json:
+        result = {
+            'config': {key: getattr(args, key) for key in
+                       ('users', 'admins', 'duration', 'workers', 'seed') if getattr(args, key) is not None},
+            'endpoints': endpoints,
+        }
+        with open(args.json, 'w') as f:
+            json.dump(result, f, indent=2)
+
+    if args.compare:
+        regressions = compare(endpoints, args.compare, args.tolerance)
+        for line in regressions:
+            print(f'REGRESSION {line}')
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Password hashing benchmark
+
+Reports how many login verifications per second one core sustains for each
+hashing setting, to pick PASSWORD_HASH_METHOD for the expected login peak.
+
+Usage:
+    python benchmarks/password_hashing.py [--seconds 2] [--json results.json]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from passwords import PasswordHasher, Argon2Hasher
+
+SETTINGS = [
+    'pbkdf2:sha256:150000',
+    'pbkdf2:sha256:260000',
+    'pbkdf2:sha256:600000',
+    'scrypt:16384:8:1',
+    'scrypt:32768:8:1',
+]
+if Argon2Hasher is not None:
+    SETTINGS += ['argon2:2:19456:1', 'argon2:3:65536:4']
+
+
+def measure(method, seconds):
+    hasher = PasswordHasher(method=method)
+    password_hash = hasher.hash('correct horse battery staple')
+    count = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < seconds:
+        hasher.verify(password_hash, 'correct horse battery staple')
+        count += 1
+    elapsed = time.perf_counter() - started
+    return {
+        'method': hasher.method,
+        'verifications': count,
+        'ms_per_login': round(elapsed / count * 1000, 2),
+        'logins_per_second_per_core': round(count / elapsed, 2)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=2.0, help='time spent per setting')
+    parser.add_argument('--json', help='write results to this file')
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'method':<28}{'ms/login':>10}{'logins/s/core':>16}")
+    for method in SETTINGS:
+        result = measure(method, args.seconds)
+        results.append(result)
+        print(f"{result['method']:<28}{result['ms_per_login']:>10}{result['logins_per_second_per_core']:>16}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'cpu_count': os.cpu_count(), 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
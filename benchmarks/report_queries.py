@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Report and export micro-benchmarks at several history sizes
+
+For each size a synthetic database is generated once (cached in
+--cache-dir) with benchmarks/generate_data.py, then every report and
+export view is called through the test client as the super admin. Each
+view is timed over --repeat runs (median and min kept) and run once more
+under tracemalloc to record peak Python memory, so the numbers show how a
+report scales with the number of requests.
+
+Usage:
+    python benchmarks/report_queries.py [--sizes 10000,100000,1000000]
+        [--only stock_report,sales_report] [--repeat 3] [--json results.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..'))
+
+VIEWS = {
+    'reports': '/reports',
+    'analytics_report': '/reports/analytics',
+    'summary_report': '/reports/summary',
+    'daily_transactions': '/reports/daily-transactions',
+    'stock_report': '/reports/stock-report',
+    'sales_report': '/reports/sales-report',
+    'pending_report': '/reports/pending-report',
+    'user_summary': '/reports/user-summary',
+    'inventory_sales_summary': '/reports/inventory-sales-summary',
+    'export_requests': '/reports/export/requests',
+    'export_inventory': '/reports/export/inventory',
+    'export_all_data': '/reports/export/all',
+}
+
+
+def ensure_database(cache_dir, size):
+    path = os.path.join(cache_dir, f'requests_{size}.db')
+    if not os.path.exists(path):
+        subprocess.run([sys.executable, os.path.join(HERE, 'generate_data.py'), '--database', path,
+                        '--requests', str(size)], check=True, cwd=cache_dir)
+    return path
+
+
+def measure_views(database, views, repeat):
+    """Time every view against one database; runs in its own process"""
+    os.environ['DATABASE_URL'] = f'sqlite:///{database}'
+    from app import create_app
+    from models import User
+
+    app = create_app('production')
+    app.config['PROPAGATE_EXCEPTIONS'] = True
+    client = app.test_client()
+    with app.app_context():
+        admin_id = User.query.filter_by(role='super_admin').first().id
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(admin_id)
+        sess['_fresh'] = True
+
+    def call(url):
+        response = client.get(url)
+        response.get_data()  # drain streamed bodies
+        if response.status_code != 200:
+            raise RuntimeError(f'HTTP {response.status_code}')
+
+    results = {}
+    for name in views:
+        url = VIEWS[name]
+        try:
+            call(url)  # warm the page cache and template compilation
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                call(url)
+                timings.append(time.perf_counter() - started)
+            tracemalloc.start()
+            call(url)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        except Exception as e:
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+            results[name] = {'error': f'{type(e).__name__}: {e}'[:200]}
+            continue
+        results[name] = {
+            'median_ms': round(statistics.median(timings) * 1000, 1),
+            'min_ms': round(min(timings) * 1000, 1),
+            'peak_memory_kb': round(peak / 1024),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='10000,100000,1000000', help='comma-separated request counts')
+    parser.add_argument('--only', help='comma-separated view names (default: all)')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--cache-dir', default=os.path.join(tempfile.gettempdir(), 'report-benchmarks'),
+                        help='where generated databases are kept between runs')
+    parser.add_argument('--json', help='write results to this file')
+    parser.add_argument('--measure', help=argparse.SUPPRESS)  # internal: one database per process
+    args = parser.parse_args()
+
+    views = args.only.split(',') if args.only else list(VIEWS)
+    unknown = set(views) - set(VIEWS)
+    if unknown:
+        parser.error(f'unknown views: {", ".join(sorted(unknown))}')
+
+    if args.measure:
+        json.dump(measure_views(args.measure, views, args.repeat), sys.stdout)
+        return
+
+    os.makedirs(args.cache_dir, exist_ok=True)
+    sizes = [int(size) for size in args.sizes.split(',')]
+    results = {}
+    for size in sizes:
+        database = ensure_database(args.cache_dir, size)
+        output = subprocess.run(
+            [sys.executable, __file__, '--measure', database, '--only', ','.join(views),
+             '--repeat', str(args.repeat)],
+            check=True, capture_output=True, text=True, cwd=args.cache_dir
+        ).stdout
+        results[size] = json.loads(output)
+
+    header = ''.join(f'{f"{size:,} ms":>14}{"peak KB":>10}' for size in sizes)
+    print(f"{'view':<26}{header}")
+    for name in views:
+        row = ''
+        for size in sizes:
+            stats = results[size][name]
+            if 'error' in stats:
+                row += f"{'error':>14}{'':>10}"
+            else:
+                row += f"{stats['median_ms']:>14}{stats['peak_memory_kb']:>10}"
+        print(f'{name:<26}{row}')
+    for size in sizes:
+        for name, stats in results[size].items():
+            if 'error' in stats:
+                print(f'{name} @ {size:,}: {stats["error"]}')
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({str(size): views_ for size, views_ in results.items()}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,9 @@
+"""
+Application blueprints
+"""
+from blueprints import auth, main, admin, reports, jobs, system
+
+
+def register_blueprints(app):
+    for module in (auth, main, admin, reports, jobs, system):
+        app.register_blueprint(module.bp)
@@ -0,0 +1,433 @@
+"""
+Administration routes: request workflow, users, inventory, settings and database
+"""
+import os
+import uuid
+from flask import Blueprint, current_app, render_template, request, redirect, url_for, flash, jsonify
+from flask_login import login_required, current_user
+from flask_mail import Message
+from sqlalchemy import false
+from sqlalchemy.orm import joinedload
+from werkzeug.utils import secure_filename
+from extensions import db, mail
+from forms import UserForm, InventoryForm, EmailSettingsForm
+from models import User, Inventory, Request, RequestItem, EmailSettings
+from database import get_db_manager, optimize_database, get_database_stats, bulk_insert_inventory, cleanup_old_data
+from events import event_bus
+from jobs import job_queue
+from lookups import schools as school_lookup, categories as category_lookup
+from stock import stock_monitor
+
+bp = Blueprint('admin', __name__)
+
+
+@bp.route('/admin/requests')
+@login_required
+def admin_requests():
+    if current_user.role not in ['admin', 'super_admin']:
+        return redirect(url_for('main.dashboard'))
+
+    # Loaded inside the template's cached fragment, only when it is stale
+    return render_template('admin_requests.html', load_requests=Request.query.options(joinedload(Request.user)).all)
+
+
+@bp.route('/admin/request/<int:request_id>/<action>')
+@login_required
+def update_request_status(request_id, action):
+    if current_user.role not in ['admin', 'super_admin', 'school_manager']:
+        return redirect(url_for('main.dashboard'))
+
+    request_obj = Request.query.get(request_id)
+    if not request_obj:
+        flash('Request not found')
+        return redirect(url_for('admin.admin_requests'))
+
+    # Check if user has permission to modify this request
+    if current_user.role == 'school_manager' and request_obj.status != 'pending_manager_approval':
+        flash('You can only approve requests pending manager approval')
+        return redirect(url_for('admin.admin_requests'))
+
+    if action == 'approve':
+        if current_user.role == 'admin':
+            # Admin can either approve directly or send to manager
+            if request.args.get('send_to_manager') == 'true':
+                request_obj.status = 'pending_manager_approval'
+                flash('Request sent to school manager for approval')
+            else:
+                request_obj.status = 'approved'
+                # Reduce inventory
+                for item in request_obj.items:
+                    inventory_item = Inventory.query.get(item.inventory_id)
+                    if inventory_item:
+                        inventory_item.quantity -= item.quantity
+                flash('Request approved')
+        elif current_user.role == 'school_manager':
+            request_obj.status = 'approved'
+            # Reduce inventory
+            for item in request_obj.items:
+                inventory_item = Inventory.query.get(item.inventory_id)
+                if inventory_item:
+                    inventory_item.quantity -= item.quantity
+            flash('Request approved by school manager')
+
+    elif action == 'reject':
+        request_obj.status = 'rejected'
+        flash('Request rejected')
+
+    elif action == 'deliver':
+        if current_user.role in ['admin', 'super_admin']:
+            request_obj.status = 'delivered'
+            flash('Request delivered')
+        else:
+            flash('Only admins can deliver requests')
+            return redirect(url_for('admin.admin_requests'))
+
+    request_obj.admin_notes = request.args.get('notes', '')
+    event_bus.publish(
+        'request_status_changed',
+        request_id=request_obj.id,
+        user_id=request_obj.user_id,
+        school_id=request_obj.school_id,
+        status=request_obj.status
+    )
+    db.session.commit()
+
+    # Send email notification
+    user = User.query.get(request_obj.user_id)
+    status_message = 'approved' if action == 'approve' else action
+    try:
+        msg = Message(
+            f'Request {status_message.title()}',
+            recipients=[user.email],
+            body=f'Your request #{request_id} has been {status_message}.'
+        )
+        mail.send_later(msg)
+    except Exception as e:
+        current_app.logger.error(f"Failed to send email: {e}")
+
+    return redirect(url_for('admin.admin_requests'))
+
+
+@bp.route('/admin/request/<int:request_id>/items')
+@login_required
+def get_request_items(request_id):
+    try:
+        if current_user.role not in ['admin', 'super_admin', 'school_manager']:
+            return jsonify({'error': 'Unauthorized'}), 403
+
+        request_obj = Request.query.get(request_id)
+        if not request_obj:
+            return jsonify({'error': 'Request not found'}), 404
+
+        items = []
+        for item in request_obj.items:
+            inventory_item = Inventory.query.get(item.inventory_id)
+            items.append({
+                'id': item.id,
+                'inventory_id': item.inventory_id,
+                'name': inventory_item.name if inventory_item else 'Unknown Item',
+                'description': inventory_item.description if inventory_item else '',
+                'quantity': item.quantity,
+                'cost': item.cost,
+                'total': item.quantity * item.cost,
+                'available_quantity': inventory_item.quantity if inventory_item else 0
+            })
+
+        return jsonify({
+            'request_id': request_id,
+            'user': request_obj.user.username,
+            'status': request_obj.status,
+            'total_cost': request_obj.total_cost,
+            'created_at': request_obj.created_at.strftime('%Y-%m-%d %H:%M'),
+            'notes': request_obj.notes,
+            'admin_notes': request_obj.admin_notes,
+            'items': items
+        })
+    except Exception as e:
+        print(f"Error in get_request_items: {e}")
+        return jsonify({'error': f'Server error: {str(e)}'}), 500
+
+
+@bp.route('/admin/request/<int:request_id>/update_quantity', methods=['POST'])
+@login_required
+def update_request_item_quantity(request_id):
+    try:
+        if current_user.role not in ['admin', 'super_admin']:
+            return jsonify({'error': 'Unauthorized'}), 403
+
+        data = request.get_json()
+        item_id = data.get('item_id')
+        new_quantity = data.get('quantity')
+
+        if not item_id or not new_quantity:
+            return jsonify({'error': 'Missing required data'}), 400
+
+        request_item = RequestItem.query.get(item_id)
+        if not request_item or request_item.request_id != request_id:
+            return jsonify({'error': 'Item not found'}), 404
+
+        # Check if new quantity is available in inventory
+        inventory_item = Inventory.query.get(request_item.inventory_id)
+        if not inventory_item:
+            return jsonify({'error': 'Inventory item not found'}), 404
+
+        # Calculate available quantity (considering current request)
+        current_request_quantity = request_item.quantity
+        available_quantity = inventory_item.quantity + current_request_quantity
+
+        if new_quantity > available_quantity:
+            return jsonify({'error': f'Only {available_quantity} items available'}), 400
+
+        # Update quantity
+        old_quantity = request_item.quantity
+        request_item.quantity = new_quantity
+        request_item.cost = inventory_item.cost
+
+        # Update request total cost
+        request_obj = Request.query.get(request_id)
+        total_cost = 0
+        for item in request_obj.items:
+            total_cost += item.quantity * item.cost
+        request_obj.total_cost = total_cost
+
+        db.session.commit()
+
+        return jsonify({
+            'success': True,
+            'message': f'Quantity updated from {old_quantity} to {new_quantity}',
+            'new_total_cost': total_cost
+        })
+    except Exception as e:
+        print(f"Error in update_request_item_quantity: {e}")
+        return jsonify({'error': f'Server error: {str(e)}'}), 500
+
+
+@bp.route('/admin/users')
+@login_required
+def admin_users():
+    if current_user.role != 'super_admin':
+        return redirect(url_for('main.dashboard'))
+
+    users = User.query.all()
+    return render_template('admin_users.html', users=users)
+
+
+@bp.route('/admin/user/new', methods=['GET', 'POST'])
+@login_required
+def new_user():
+    if current_user.role != 'super_admin':
+        return redirect(url_for('main.dashboard'))
+
+    form = UserForm()
+    if form.validate_on_submit():
+        user = User(
+            username=form.username.data,
+            email=form.email.data,
+            role=form.role.data,
+            school_id=school_lookup.id_for(form.school.data, create=True)
+        )
+        user.set_password(form.password.data)
+        db.session.add(user)
+        db.session.commit()
+        flash('User created successfully')
+        return redirect(url_for('admin.admin_users'))
+
+    return render_template('new_user.html', form=form)
+
+
+@bp.route('/admin/inventory')
+@login_required
+def admin_inventory():
+    if current_user.role != 'super_admin':
+        return redirect(url_for('main.dashboard'))
+
+    search = request.args.get('search', '')
+    category_filter = request.args.get('category', '')
+
+    # Base query - all items
+    query = Inventory.query
+
+    # Apply search filter if provided
+    if search:
+        query = query.filter(Inventory.name.ilike(f'%{search}%'))
+
+    # Apply category filter if provided
+    if category_filter:
+        category_id = category_lookup.id_for(category_filter)
+        query = query.filter(Inventory.category_id == category_id if category_id else false())
+
+    items = query.all()
+
+    # Categories that have items, for the filter dropdown
+    categories = stock_monitor.category_names()
+
+    return render_template('admin_inventory.html', items=items, categories=categories, search=search, category_filter=category_filter)
+
+
+@bp.route('/admin/inventory/new', methods=['GET', 'POST'])
+@login_required
+def new_inventory():
+    if current_user.role != 'super_admin':
+        return redirect(url_for('main.dashboard'))
+
+    form = InventoryForm()
+    if form.validate_on_submit():
+        item = Inventory(
+            name=form.name.data,
+            description=form.description.data,
+            quantity=form.quantity.data,
+            cost=float(form.cost.data),
+            category_id=category_lookup.id_for(form.category.data, create=True),
+            reorder_threshold=form.reorder_threshold.data
+        )
+        db.session.add(item)
+        db.session.commit()
+        flash('Inventory item created successfully')
+        return redirect(url_for('admin.admin_inventory'))
+
+    return render_template('new_inventory.html', form=form)
+
+
+@bp.route('/admin/inventory/upload', methods=['GET', 'POST'])
+@login_required
+def upload_inventory():
+    if current_user.role != 'super_admin':
+        return redirect(url_for('main.dashboard'))
+
+    if request.method == 'POST':
+        if 'file' not in request.files:
+            flash('No file selected')
+            return redirect(request.url)
+
+        file = request.files['file']
+        if file.filename == '':
+            flash('No file selected')
+            return redirect(request.url)
+
+        if file and file.filename.endswith('.xlsx'):
+            # The worker reads the file from the jobs directory, which it
+            # shares with the web workers; a unique name keeps uploads apart
+            filename = f'upload-{uuid.uuid4().hex}-{secure_filename(file.filename)}'
+            filepath = os.path.join(job_queue.directory, filename)
+            file.save(filepath)
+
+            job_id = job_queue.enqueue('import_inventory', current_user.id, path=filepath)
+            flash('Inventory upload queued')
+            return redirect(url_for('jobs.job_page', job_id=job_id))
+
+    return render_template('upload_inventory.html')
+
+
+@job_queue.task('import_inventory')
+def import_inventory_job(job):
+    filepath = job.params['path']
+    try:
+        # pandas is only needed for Excel features; importing it lazily
+        # keeps it out of worker startup.
+        import pandas as pd
+        job.progress(0, 'Reading spreadsheet')
+        df = pd.read_excel(filepath)
+
+        # Use bulk insert for better performance with large datasets
+        job.progress(30, f'Saving {len(df)} items')
+        bulk_insert_inventory(df)
+
+        job.progress(100, f'Inventory uploaded successfully: {len(df)} items')
+    finally:
+        os.remove(filepath)
+
+
+@bp.route('/admin/settings')
+@login_required
+def admin_settings():
+    if current_user.role != 'super_admin':
+        return redirect(url_for('main.dashboard'))
+
+    settings = EmailSettings.query.first()
+    form = EmailSettingsForm(obj=settings)
+
+    if form.validate_on_submit():
+        if settings:
+            settings.smtp_server = form.smtp_server.data
+            settings.smtp_port = form.smtp_port.data
+            settings.username = form.username.data
+            settings.password = form.password.data
+            settings.use_tls = form.use_tls.data
+        else:
+            settings = EmailSettings(
+                smtp_server=form.smtp_server.data,
+                smtp_port=form.smtp_port.data,
+                username=form.username.data,
+                password=form.password.data,
+                use_tls=form.use_tls.data
+            )
+            db.session.add(settings)
+
+        db.session.commit()
+        flash('Settings updated successfully')
+        return redirect(url_for('admin.admin_settings'))
+
+    return render_template('admin_settings.html', form=form)
+
+
+@bp.route('/admin/database/stats')
+@login_required
+def database_stats():
+    if current_user.role != 'super_admin':
+        return redirect(url_for('main.dashboard'))
+
+    # Get current database stats
+    current_stats = get_database_stats()
+
+    # Get all database stats
+    all_db_stats = get_db_manager().get_all_database_stats()
+
+    return render_template('database_stats.html', 
+                         stats=current_stats, 
+                         all_db_stats=all_db_stats,
+                         current_db=get_db_manager().get_current_database())
+
+
+@bp.route('/admin/database/optimize')
+@login_required
+def optimize_database_route():
+    if current_user.role != 'super_admin':
+        return redirect(url_for('main.dashboard'))
+
+    success = optimize_database()
+    if success:
+        flash('Database optimized successfully')
+    else:
+        flash('Database optimization failed')
+
+    return redirect(url_for('admin.database_stats'))
+
+
+@bp.route('/admin/database/cleanup')
+@login_required
+def cleanup_database():
+    if current_user.role != 'super_admin':
+        return redirect(url_for('main.dashboard'))
+
+    success, message = cleanup_old_data()
+    if success:
+        flash(f'Database cleanup completed: {message}')
+    else:
+        flash(f'Database cleanup failed: {message}')
+
+    return redirect(url_for('admin.database_stats'))
+
+
+@bp.route('/admin/database/switch')
+@login_required
+def switch_database():
+    if current_user.role != 'super_admin':
+        return redirect(url_for('main.dashboard'))
+
+    success = get_db_manager().switch_to_next_database()
+    if success:
+        flash('Successfully switched to next database')
+    else:
+        flash('Failed to switch database')
+
+    return redirect(url_for('admin.database_stats'))
@@ -0,0 +1,102 @@
+"""
+Authentication and session keep-alive routes
+"""
+import time
+from flask import Blueprint, current_app, render_template, request, redirect, url_for, flash, session, jsonify, g
+from flask_login import login_user, logout_user, login_required, current_user
+from extensions import db
+from forms import LoginForm
+from models import User
+
+bp = Blueprint('auth', __name__)
+
+
+# Session expiry is tracked in the signed cookie itself so that
+# /session/status can answer without loading the user. Requests to passive
+# endpoints (polling, probes, scrapes) neither extend nor re-issue it.
+SESSION_PASSIVE_ENDPOINTS = (
+    'auth.session_status', 'system.event_stream', 'system.liveness', 'system.readiness_check',
+    'system.prometheus_metrics', 'static'
+)
+
+
+def touch_session():
+    session['expires_at'] = int(time.time() + current_app.permanent_session_lifetime.total_seconds())
+
+
+@bp.before_app_request
+def refresh_session_expiry():
+    if '_user_id' not in session:
+        return
+    # Sessions signed in before expiry tracking get their deadline on the next request
+    if request.endpoint not in SESSION_PASSIVE_ENDPOINTS or 'expires_at' not in session:
+        touch_session()
+    else:
+        g.passive_session_check = True
+
+
+@bp.route('/login', methods=['GET', 'POST'])
+def login():
+    if current_user.is_authenticated:
+        return redirect(url_for('main.dashboard'))
+
+    form = LoginForm()
+    if form.validate_on_submit():
+        user = User.query.filter_by(username=form.username.data).first()
+        if user and user.check_password(form.password.data):
+            # Upgrade the stored hash when the configured cost has changed
+            if user.password_needs_rehash():
+                user.set_password(form.password.data)
+                db.session.commit()
+            login_user(user, remember=True)
+            session.permanent = True
+            touch_session()
+            next_page = request.args.get('next')
+            return redirect(next_page) if next_page else redirect(url_for('main.dashboard'))
+        else:
+            flash('Invalid username or password', 'error')
+
+    return render_template('login.html', form=form)
+
+
+@bp.route('/logout')
+@login_required
+def logout():
+    logout_user()
+    return redirect(url_for('main.index'))
+
+
+@bp.route('/session-timeout')
+def session_timeout():
+    """Handle session timeout"""
+    logout_user()
+    flash('Your session has expired due to inactivity. Please login again.', 'warning')
+    return redirect(url_for('auth.login'))
+
+
+@bp.route('/session/status')
+def session_status():
+    """Report session validity from the signed cookie alone (no DB access).
+
+    Passing `active=1` extends the session for tabs with recent user
+    activity; otherwise the cookie is left untouched.
+    """
+    expires_at = session.get('expires_at', 0)
+    remaining = expires_at - int(time.time())
+    if '_user_id' not in session or remaining <= 0:
+        g.passive_session_check = True
+        return jsonify({'valid': False, 'expires_in': 0}), 401
+
+    if request.args.get('active') == '1':
+        touch_session()
+        remaining = int(current_app.permanent_session_lifetime.total_seconds())
+    elif not session.modified:  # keep a deadline just set by refresh_session_expiry
+        g.passive_session_check = True
+    return jsonify({'valid': True, 'expires_in': remaining})
+
+
+@bp.route('/check-session')
+@login_required
+def check_session():
+    """Check if session is still valid"""
+    return jsonify({'valid': True, 'user': current_user.username})
@@ -0,0 +1,55 @@
+"""
+Background job progress and result download routes
+"""
+import os
+from flask import Blueprint, render_template, redirect, url_for, flash, jsonify
+from flask_login import login_required, current_user
+from downloads import downloads
+from extensions import db
+from jobs import job_queue
+from models import Job
+
+bp = Blueprint('jobs', __name__)
+
+JOB_TITLES = {
+    'export_all': 'Full data export',
+    'import_inventory': 'Inventory upload',
+}
+
+
+def visible_job(job_id):
+    """The job if the current user queued it (super admins see every job)"""
+    job = db.session.get(Job, job_id)
+    if job is None or (job.user_id != current_user.id and current_user.role != 'super_admin'):
+        return None
+    return job
+
+
+@bp.route('/jobs/<int:job_id>')
+@login_required
+def job_page(job_id):
+    job = visible_job(job_id)
+    if job is None:
+        flash('Job not found')
+        return redirect(url_for('main.dashboard'))
+    return render_template('job_status.html', job=job, title=JOB_TITLES.get(job.kind, job.kind),
+                           status=job_queue.describe(job))
+
+
+@bp.route('/jobs/<int:job_id>/status')
+@login_required
+def job_status(job_id):
+    job = visible_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job_queue.describe(job))
+
+
+@bp.route('/jobs/<int:job_id>/download')
+@login_required
+def job_download(job_id):
+    job = visible_job(job_id)
+    if job is None or job.status != 'done' or not job.result_path or not os.path.exists(job.result_path):
+        flash('That download is no longer available')
+        return redirect(url_for('main.dashboard'))
+    return downloads.send(job.result_path, job.result_name)
@@ -0,0 +1,323 @@
+"""
+Inventory browsing, cart, request submission and comment routes
+"""
+import json
+from datetime import datetime
+from flask import Blueprint, current_app, render_template, request, redirect, url_for, flash, jsonify
+from flask_login import login_required, current_user
+from flask_mail import Message
+from sqlalchemy import false
+from sqlalchemy.orm import joinedload
+from extensions import db, mail
+from models import User, Inventory, Request, RequestItem, Comment
+from database import get_db_manager
+from events import event_bus
+from stock import stock_monitor
+from lookups import categories as category_lookup
+
+bp = Blueprint('main', __name__)
+
+
+@bp.route('/')
+def index():
+    if current_user.is_authenticated:
+        return redirect(url_for('main.dashboard'))
+    return render_template('login.html')
+
+
+@bp.route('/dashboard')
+@login_required
+def dashboard():
+    if current_user.role == 'super_admin':
+        return render_template('admin_dashboard.html')
+    elif current_user.role == 'admin':
+        return render_template('admin_dashboard.html')
+    elif current_user.role == 'school_manager':
+        return render_template('school_manager_dashboard.html')
+    else:
+        return render_template('user_dashboard.html')
+
+
+@bp.route('/inventory')
+@login_required
+def inventory():
+    search = request.args.get('search', '')
+    category_filter = request.args.get('category', '')
+
+    query = Inventory.query.filter(Inventory.quantity > 0)
+
+    if search:
+        query = query.filter(Inventory.name.ilike(f'%{search}%'))
+
+    if category_filter:
+        category_id = category_lookup.id_for(category_filter)
+        query = query.filter(Inventory.category_id == category_id if category_id else false())
+
+    items = query.all()
+    categories = stock_monitor.category_names()
+
+    return render_template('inventory.html', items=items, categories=categories, search=search, category_filter=category_filter)
+
+
+@bp.route('/cart')
+@login_required
+def cart():
+    cart_data = request.cookies.get('cart', '{}')
+    try:
+        cart_items = json.loads(cart_data)
+    except:
+        cart_items = {}
+
+    items = []
+    total_cost = 0
+
+    for item_id, quantity in cart_items.items():
+        item = Inventory.query.get(item_id)
+        if item and item.quantity >= quantity:
+            items.append({
+                'id': item.id,
+                'name': item.name,
+                'quantity': quantity,
+                'cost': item.cost,
+                'total': item.cost * quantity
+            })
+            total_cost += item.cost * quantity
+
+    return render_template('cart.html', items=items, total_cost=total_cost)
+
+
+@bp.route('/add-to-cart', methods=['POST'])
+@login_required
+def add_to_cart():
+    item_id = request.form.get('item_id')
+    quantity = int(request.form.get('quantity', 1))
+
+    item = Inventory.query.get(item_id)
+    if not item or item.quantity < quantity:
+        return jsonify({'success': False, 'message': 'Item not available'})
+
+    # Get current cart
+    cart_data = request.cookies.get('cart', '{}')
+    try:
+        cart_items = json.loads(cart_data)
+    except:
+        cart_items = {}
+
+    # Update cart
+    if item_id in cart_items:
+        cart_items[item_id] += quantity
+    else:
+        cart_items[item_id] = quantity
+
+    response = jsonify({'success': True, 'message': 'Added to cart'})
+    response.set_cookie('cart', json.dumps(cart_items))
+    return response
+
+
+@bp.route('/submit-request', methods=['POST'])
+@login_required
+def submit_request():
+    get_db_manager().check_and_switch_if_needed()
+
+    cart_data = request.cookies.get('cart', '{}')
+    try:
+        cart_items = json.loads(cart_data)
+    except:
+        return jsonify({'success': False, 'message': 'Invalid cart data'})
+
+    if not cart_items:
+        return jsonify({'success': False, 'message': 'Cart is empty'})
+
+    total_cost = 0
+    request_items = []
+
+    for item_id, quantity in cart_items.items():
+        item = Inventory.query.get(item_id)
+        if item and item.quantity >= quantity:
+            total_cost += item.cost * quantity
+            request_items.append({
+                'item': item,
+                'quantity': quantity,
+                'cost': item.cost
+            })
+
+    if not request_items:
+        return jsonify({'success': False, 'message': 'No valid items in cart'})
+
+    # Create request
+    new_request = Request(
+        user_id=current_user.id,
+        school_id=current_user.school_id,
+        status='pending',
+        total_cost=total_cost
+    )
+    db.session.add(new_request)
+    db.session.flush()  # Get the request ID
+
+    # Create request items
+    for item_data in request_items:
+        request_item = RequestItem(
+            request_id=new_request.id,
+            inventory_id=item_data['item'].id,
+            quantity=item_data['quantity'],
+            cost=item_data['cost']
+        )
+        db.session.add(request_item)
+
+        # Update inventory
+        item_data['item'].quantity -= item_data['quantity']
+
+    event_bus.publish(
+        'request_created',
+        request_id=new_request.id,
+        user_id=current_user.id,
+        school_id=new_request.school_id,
+        username=current_user.username,
+        email=current_user.email,
+        status=new_request.status,
+        total_cost=total_cost,
+        created_at=datetime.utcnow().strftime('%Y-%m-%d %H:%M')
+    )
+    db.session.commit()
+
+    # Send email notification
+    try:
+        msg = Message(
+            'New Resource Request',
+            recipients=[current_user.email],
+            body=f'Your request for ${total_cost:.2f} has been submitted and is pending approval.'
+        )
+        mail.send_later(msg)
+    except Exception as e:
+        current_app.logger.error(f"Failed to send email: {e}")
+
+    return jsonify({'success': True, 'message': 'Request submitted successfully'})
+
+
+def serialize_comment(comment, username=None):
+    return {
+        'id': comment.id,
+        'user': username or comment.user.username,
+        'comment': comment.comment,
+        'created_at': comment.created_at.strftime('%Y-%m-%d %H:%M')
+    }
+
+
+@bp.route('/request/<int:request_id>/comments')
+@login_required
+def get_request_comments(request_id):
+    request_obj = Request.query.get(request_id)
+    if not request_obj:
+        return jsonify({'error': 'Request not found'}), 404
+
+    # Check if user has permission to view comments
+    # Users can only view their own requests, but admins and school managers can view any request
+    if current_user.role == 'user' and request_obj.user_id != current_user.id:
+        return jsonify({'error': 'Unauthorized'}), 403
+    elif current_user.role not in ['admin', 'super_admin', 'school_manager'] and request_obj.user_id != current_user.id:
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    # Cursor pagination on the primary key: `since_id` returns only comments
+    # newer than the last one the client has, `before_id` pages backwards
+    # through older history. Without either, the latest page is returned.
+    since_id = request.args.get('since_id', type=int)
+    before_id = request.args.get('before_id', type=int)
+    limit = request.args.get('limit', current_app.config['COMMENTS_PAGE_SIZE'], type=int)
+    limit = max(1, min(limit, current_app.config['COMMENTS_PAGE_SIZE_MAX']))
+
+    query = Comment.query.options(joinedload(Comment.user)).filter(Comment.request_id == request_id)
+    if since_id is not None:
+        comments = query.filter(Comment.id > since_id).order_by(Comment.id.asc()).limit(limit + 1).all()
+        has_more = len(comments) > limit
+        comments = comments[:limit]
+    else:
+        if before_id is not None:
+            query = query.filter(Comment.id < before_id)
+        comments = query.order_by(Comment.id.desc()).limit(limit + 1).all()
+        has_more = len(comments) > limit
+        comments = list(reversed(comments[:limit]))
+
+    return jsonify({
+        'comments': [serialize_comment(comment) for comment in comments],
+        'has_more': has_more,
+        'last_id': comments[-1].id if comments else since_id
+    })
+
+
+@bp.route('/request/<int:request_id>/add_comment', methods=['POST'])
+@login_required
+def add_comment(request_id):
+    request_obj = Request.query.get(request_id)
+    if not request_obj:
+        return jsonify({'error': 'Request not found'}), 404
+
+    # Check if user has permission to add comments
+    # Users can only comment on their own requests, but admins and school managers can comment on any request
+    if current_user.role == 'user' and request_obj.user_id != current_user.id:
+        return jsonify({'error': 'Unauthorized'}), 403
+    elif current_user.role not in ['admin', 'super_admin', 'school_manager'] and request_obj.user_id != current_user.id:
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    data = request.get_json()
+    comment_text = data.get('comment')
+
+    if not comment_text:
+        return jsonify({'error': 'Comment is required'}), 400
+
+    new_comment = Comment(
+        request_id=request_id,
+        user_id=current_user.id,
+        comment=comment_text
+    )
+    db.session.add(new_comment)
+    db.session.flush()
+    comment_data = serialize_comment(new_comment, username=current_user.username)
+    event_bus.publish('comment_added', request_id=request_id, user_id=request_obj.user_id,
+                      school_id=request_obj.school_id, comment=comment_data)
+    db.session.commit()
+
+    # Send email notification to request owner
+    if current_user.id != request_obj.user_id:
+        user = User.query.get(request_obj.user_id)
+        try:
+            msg = Message(
+                'New Comment on Request',
+                recipients=[user.email],
+                body=f'A new comment has been added to your request #{request_id}.'
+            )
+            mail.send_later(msg)
+        except Exception as e:
+            current_app.logger.error(f"Failed to send email: {e}")
+
+    return jsonify({'success': True, 'message': 'Comment added successfully', 'comment': comment_data})
+
+
+@bp.route('/request/<int:request_id>/view')
+@login_required
+def view_request_comments(request_id):
+    request_obj = Request.query.get(request_id)
+    if not request_obj:
+        flash('Request not found')
+        return redirect(url_for('main.dashboard'))
+
+    # Check if user has permission to view this request
+    # Users can only view their own requests, but admins and school managers can view any request
+    if current_user.role == 'user' and request_obj.user_id != current_user.id:
+        flash('You can only view your own requests')
+        return redirect(url_for('main.dashboard'))
+    elif current_user.role not in ['admin', 'super_admin', 'school_manager'] and request_obj.user_id != current_user.id:
+        flash('You can only view your own requests')
+        return redirect(url_for('main.dashboard'))
+
+    return render_template('request_comments.html', request=request_obj)
+
+
+@bp.route('/school-manager/requests')
+@login_required
+def school_manager_requests():
+    if current_user.role != 'school_manager':
+        return redirect(url_for('main.dashboard'))
+
+    # Get requests pending manager approval
+    pending_requests = Request.query.filter_by(status='pending_manager_approval').all()
+    return render_template('school_manager_requests.html', requests=pending_requests)
@@ -0,0 +1,456 @@
+"""
+Reporting and export routes
+"""
+import csv
+from datetime import datetime, timedelta
+from flask import Blueprint, abort, render_template, redirect, url_for
+from flask_login import login_required, current_user
+from sqlalchemy import func
+from downloads import downloads
+from extensions import db
+from jobs import job_queue
+from models import User, Category, Inventory, CategoryStock, Request, RequestItem
+from report_rows import request_rows, inventory_rows, request_item_rows, user_rows, fetch, stream
+from scoping import school_scope
+from snapshots import report_snapshots
+from stock import stock_monitor
+from time_buckets import bucket_start, last_buckets, time_buckets
+
+bp = Blueprint('reports', __name__)
+
+
+@bp.route('/reports')
+@login_required
+def reports():
+    if current_user.role not in ['admin', 'super_admin', 'school_manager']:
+        return redirect(url_for('main.dashboard'))
+
+    # Computed inside the template's cached fragment, only when it is stale
+    return render_template('reports.html', overview=reports_overview)
+
+
+def reports_overview():
+    # Generate reports
+    total_requests = Request.query.count()
+    pending_requests = Request.query.filter_by(status='pending').count()
+    approved_requests = Request.query.filter_by(status='approved').count()
+    delivered_requests = Request.query.filter_by(status='delivered').count()
+    rejected_requests = Request.query.filter_by(status='rejected').count()
+
+    # Monthly statistics
+    monthly_requests = Request.query.filter(
+        Request.created_at >= bucket_start(datetime.utcnow(), 'month')
+    ).count()
+
+    # Analytics data
+    # Get requests by month for the last 6 months
+    monthly_data = time_buckets({'count': func.count(Request.id)}, *last_buckets(6, 'month'))
+
+    # Get top requested items with current inventory quantity
+    top_items = db.session.query(
+        Inventory.name,
+        Inventory.quantity,
+        func.sum(RequestItem.quantity).label('total_requested')
+    ).join(RequestItem).group_by(Inventory.name, Inventory.quantity).order_by(
+        func.sum(RequestItem.quantity).desc()
+    ).limit(10).all()
+
+    return {
+        'total_requests': total_requests,
+        'pending_requests': pending_requests,
+        'approved_requests': approved_requests,
+        'delivered_requests': delivered_requests,
+        'rejected_requests': rejected_requests,
+        'monthly_requests': monthly_requests,
+        'monthly_data': monthly_data,
+        'top_items': top_items
+    }
+
+
+@bp.route('/reports/export/requests')
+@login_required
+def export_requests():
+    if current_user.role not in ['admin', 'super_admin', 'school_manager']:
+        return redirect(url_for('main.dashboard'))
+
+    # Write the CSV to the spool; nginx sends it (see downloads.py)
+    path = downloads.spool_path('requests', '.csv')
+    with open(path, 'w', newline='', encoding='utf-8') as output:
+        writer = csv.writer(output)
+        writer.writerow(['Request ID', 'User', 'Status', 'Total Cost', 'Created Date', 'Notes', 'Admin Notes'])
+
+        for req in stream(request_rows(Request.notes, Request.admin_notes)):
+            writer.writerow([
+                req.id,
+                req.username,
+                req.status,
+                f"${req.total_cost:.2f}",
+                req.created_at.strftime('%Y-%m-%d %H:%M'),
+                req.notes or '',
+                req.admin_notes or ''
+            ])
+
+    return downloads.send(
+        path,
+        f'requests_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv',
+        mimetype='text/csv'
+    )
+
+
+@bp.route('/reports/export/inventory')
+@login_required
+def export_inventory():
+    if current_user.role not in ['admin', 'super_admin', 'school_manager']:
+        return redirect(url_for('main.dashboard'))
+
+    # Write the CSV to the spool; nginx sends it (see downloads.py)
+    path = downloads.spool_path('inventory', '.csv')
+    with open(path, 'w', newline='', encoding='utf-8') as output:
+        writer = csv.writer(output)
+        writer.writerow(['ID', 'Name', 'Description', 'Quantity', 'Cost', 'Category', 'Total Value', 'Last Updated'])
+
+        for item in stream(inventory_rows(Inventory.description)):
+            writer.writerow([
+                item.id,
+                item.name,
+                item.description or '',
+                item.quantity,
+                f"${item.cost:.2f}",
+                item.category or '',
+                f"${item.stock_value:.2f}",
+                item.updated_at.strftime('%Y-%m-%d %H:%M')
+            ])
+
+    return downloads.send(
+        path,
+        f'inventory_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv',
+        mimetype='text/csv'
+    )
+
+
+@bp.route('/reports/export/all')
+@login_required
+def export_all_data():
+    if current_user.role not in ['admin', 'super_admin', 'school_manager']:
+        return redirect(url_for('main.dashboard'))
+
+    # Building the workbook takes minutes on a large district; a jobs worker
+    # does it and the job page offers the file when it is ready
+    job_id = job_queue.enqueue('export_all', current_user.id, school_id=school_scope.current())
+    return redirect(url_for('jobs.job_page', job_id=job_id))
+
+
+@job_queue.task('export_all')
+def export_all_job(job):
+    # pandas is only needed for Excel features; import it on first use
+    import pandas as pd
+
+    school_scope.use(job.params['school_id'])
+    path = job.output_path('.xlsx')
+
+    def sheet(name, columns, records):
+        # One tuple per row: cheaper to build than a dict per row
+        pd.DataFrame.from_records(list(records), columns=columns).to_excel(writer, sheet_name=name, index=False)
+
+    # Create Excel file with multiple sheets
+    with pd.ExcelWriter(path, engine='openpyxl') as writer:
+        job.progress(0, 'Exporting users')
+        sheet('Users', ['ID', 'Username', 'Email', 'Role', 'School', 'Created At', 'Is Active'], (
+            (user.id, user.username, user.email, user.role, user.school or '',
+             user.created_at.strftime('%Y-%m-%d %H:%M'), user.is_active)
+            for user in stream(user_rows(*school_scope.user_criteria()))
+        ))
+
+        job.progress(25, 'Exporting requests')
+        sheet('Requests', ['ID', 'User', 'Status', 'Total Cost', 'Created Date', 'Notes', 'Admin Notes'], (
+            (req.id, req.username, req.status, req.total_cost, req.created_at.strftime('%Y-%m-%d %H:%M'),
+             req.notes or '', req.admin_notes or '')
+            for req in stream(request_rows(Request.notes, Request.admin_notes))
+        ))
+
+        job.progress(50, 'Exporting inventory')
+        sheet('Inventory', ['ID', 'Name', 'Description', 'Quantity', 'Cost', 'Category', 'Total Value',
+                            'Created At', 'Updated At'], (
+            (item.id, item.name, item.description or '', item.quantity, item.cost, item.category or '',
+             item.stock_value, item.created_at.strftime('%Y-%m-%d %H:%M'), item.updated_at.strftime('%Y-%m-%d %H:%M'))
+            for item in stream(inventory_rows(Inventory.description, Inventory.created_at))
+        ))
+
+        job.progress(75, 'Exporting request items')
+        sheet('Request Items', ['ID', 'Request ID', 'User', 'Item Name', 'Quantity', 'Cost', 'Total'], (
+            (item.id, item.request_id, item.username, item.item_name, item.quantity, item.cost,
+             item.quantity * item.cost)
+            for item in stream(request_item_rows())
+        ))
+
+    return path, f'all_data_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
+
+
+@bp.route('/reports/analytics')
+@login_required
+def analytics_report():
+    if current_user.role not in ['admin', 'super_admin', 'school_manager']:
+        return redirect(url_for('main.dashboard'))
+
+    # Get analytics data
+    # Monthly trends for the last 6 months
+    monthly_trends = time_buckets({
+        'count': func.count(Request.id),
+        'total_cost': func.sum(Request.total_cost)
+    }, *last_buckets(6, 'month'))
+
+    # Status distribution
+    status_distribution = db.session.query(
+        Request.status,
+        func.count(Request.id).label('count')
+    ).group_by(Request.status).all()
+
+    # Top requested items
+    top_items = db.session.query(
+        Inventory.name,
+        func.sum(RequestItem.quantity).label('total_requested'),
+        func.sum(RequestItem.quantity * RequestItem.cost).label('total_value')
+    ).join(RequestItem).group_by(Inventory.name).order_by(
+        func.sum(RequestItem.quantity).desc()
+    ).limit(10).all()
+
+    # User activity
+    user_activity = db.session.query(
+        User.username,
+        func.count(Request.id).label('request_count'),
+        func.sum(Request.total_cost).label('total_spent')
+    ).join(Request).group_by(User.id).order_by(
+        func.count(Request.id).desc()
+    ).limit(10).all()
+
+    return render_template('analytics.html',
+                         monthly_trends=monthly_trends,
+                         status_distribution=status_distribution,
+                         top_items=top_items,
+                         user_activity=user_activity)
+
+
+@bp.route('/reports/summary')
+@login_required
+def summary_report():
+    if current_user.role not in ['admin', 'super_admin', 'school_manager']:
+        return redirect(url_for('main.dashboard'))
+
+    context, generated_at = report_snapshots.latest('summary_report')
+    return render_template('summary.html', report='summary_report', generated_at=generated_at, **context)
+
+
+@report_snapshots.report('summary_report')
+def build_summary_report():
+    # Generate summary statistics
+    total_users = User.query.filter(*school_scope.user_criteria()).count()
+    total_inventory_items = Inventory.query.count()
+    total_requests = Request.query.count()
+    total_inventory_value = db.session.query(func.sum(CategoryStock.total_value)).scalar() or 0
+
+    # Recent activity (last 7 days)
+    week_ago = datetime.now() - timedelta(days=7)
+    recent_requests = Request.query.filter(Request.created_at >= week_ago).count()
+    recent_users = User.query.filter(User.created_at >= week_ago, *school_scope.user_criteria()).count()
+
+    # Low stock items (flag maintained by the stock engine)
+    low_stock_items = Inventory.query.filter(Inventory.below_threshold.is_(True)).count()
+
+    # Pending requests
+    pending_requests = Request.query.filter_by(status='pending').count()
+
+    return {
+        'total_users': total_users,
+        'total_inventory_items': total_inventory_items,
+        'total_requests': total_requests,
+        'total_inventory_value': total_inventory_value,
+        'recent_requests': recent_requests,
+        'recent_users': recent_users,
+        'low_stock_items': low_stock_items,
+        'pending_requests': pending_requests
+    }
+
+
+@bp.route('/reports/daily-transactions')
+@login_required
+def daily_transactions():
+    if current_user.role not in ['admin', 'super_admin', 'school_manager']:
+        return redirect(url_for('main.dashboard'))
+
+    # Get daily transactions for the last 30 days, newest first
+    daily_data = time_buckets({
+        'requests': func.count(Request.id),
+        'total_cost': func.sum(Request.total_cost)
+    }, *last_buckets(30, 'day'))[::-1]
+
+    return render_template('daily_transactions.html', daily_data=daily_data)
+
+
+@bp.route('/reports/stock-report')
+@login_required
+def stock_report():
+    if current_user.role not in ['admin', 'super_admin', 'school_manager']:
+        return redirect(url_for('main.dashboard'))
+
+    # Get stock information
+    low_stock_items = stock_monitor.low_stock()
+    out_of_stock_items = [entry.item for entry in low_stock_items if entry.item.quantity == 0]
+    high_value_items = fetch(inventory_rows().order_by(Inventory.stock_value.desc()).limit(10))
+
+    # Stock categories (running totals)
+    stock_by_category = stock_monitor.category_totals()
+
+    return render_template('stock_report.html',
+                         low_stock_items=low_stock_items,
+                         out_of_stock_items=out_of_stock_items,
+                         high_value_items=high_value_items,
+                         stock_by_category=stock_by_category)
+
+
+@bp.route('/reports/sales-report')
+@login_required
+def sales_report():
+    if current_user.role not in ['admin', 'super_admin', 'school_manager']:
+        return redirect(url_for('main.dashboard'))
+
+    context, generated_at = report_snapshots.latest('sales_report')
+    return render_template('sales_report.html', report='sales_report', generated_at=generated_at, **context)
+
+
+@report_snapshots.report('sales_report')
+def build_sales_report():
+    # Get sales data (delivered requests): totals plus the latest ten
+    delivered_count, delivered_total = db.session.query(
+        func.count(Request.id), func.coalesce(func.sum(Request.total_cost), 0)
+    ).filter(Request.status == 'delivered').one()
+    recent_deliveries = fetch(
+        request_rows().where(Request.status == 'delivered').order_by(Request.updated_at.desc()).limit(10)
+    )
+
+    # Sales by month
+    monthly_sales = time_buckets({
+        'orders': func.count(Request.id),
+        'revenue': func.sum(Request.total_cost)
+    }, *last_buckets(6, 'month'), filters=[Request.status == 'delivered'])
+
+    # Top selling items
+    top_selling_items = db.session.query(
+        Inventory.name,
+        func.sum(RequestItem.quantity).label('units_sold'),
+        func.sum(RequestItem.quantity * RequestItem.cost).label('revenue')
+    ).join(RequestItem).join(Request).filter(Request.status == 'delivered').group_by(
+        Inventory.name
+    ).order_by(func.sum(RequestItem.quantity * RequestItem.cost).desc()).limit(10).all()
+
+    return {
+        'delivered_count': delivered_count,
+        'delivered_total': delivered_total,
+        'recent_deliveries': [row._asdict() for row in recent_deliveries],
+        'monthly_sales': monthly_sales,
+        'top_selling_items': [row._asdict() for row in top_selling_items]
+    }
+
+
+@bp.route('/reports/pending-report')
+@login_required
+def pending_report():
+    if current_user.role not in ['admin', 'super_admin', 'school_manager']:
+        return redirect(url_for('main.dashboard'))
+
+    # Get pending requests
+    pending_requests = fetch(
+        request_rows(Request.notes).where(Request.status == 'pending').order_by(Request.created_at.desc())
+    )
+    approved_requests = fetch(
+        request_rows(Request.notes).where(Request.status == 'approved').order_by(Request.created_at.desc())
+    )
+
+    # Pending by user
+    pending_by_user = db.session.query(
+        User.username,
+        func.count(Request.id).label('pending_count'),
+        func.sum(Request.total_cost).label('total_value')
+    ).join(Request).filter(Request.status == 'pending').group_by(User.id).order_by(
+        func.count(Request.id).desc()
+    ).all()
+
+    return render_template('pending_report.html',
+                         pending_requests=pending_requests,
+                         approved_requests=approved_requests,
+                         pending_by_user=pending_by_user)
+
+
+@bp.route('/reports/user-summary')
+@login_required
+def user_summary():
+    if current_user.role not in ['admin', 'super_admin', 'school_manager']:
+        return redirect(url_for('main.dashboard'))
+
+    # User activity summary
+    user_activity = db.session.query(
+        User.username,
+        User.email,
+        User.role,
+        func.count(Request.id).label('total_requests'),
+        func.sum(Request.total_cost).label('total_spent'),
+        func.max(Request.created_at).label('last_request')
+    ).outerjoin(Request).filter(*school_scope.user_criteria()).group_by(User.id).order_by(
+        func.count(Request.id).desc()
+    ).all()
+
+    # Recent user registrations
+    recent_users = User.query.filter(*school_scope.user_criteria()).order_by(
+        User.created_at.desc()
+    ).limit(10).all()
+
+    return render_template('user_summary.html',
+                         user_activity=user_activity,
+                         recent_users=recent_users)
+
+
+@bp.route('/reports/inventory-sales-summary')
+@login_required
+def inventory_sales_summary():
+    if current_user.role not in ['admin', 'super_admin', 'school_manager']:
+        return redirect(url_for('main.dashboard'))
+
+    context, generated_at = report_snapshots.latest('inventory_sales_summary')
+    return render_template('inventory_sales_summary.html', report='inventory_sales_summary',
+                           generated_at=generated_at, **context)
+
+
+@report_snapshots.report('inventory_sales_summary')
+def build_inventory_sales_summary():
+    # Inventory sales summary
+    inventory_sales = db.session.query(
+        Inventory.name,
+        Category.name.label('category'),
+        Inventory.quantity.label('current_stock'),
+        func.coalesce(func.sum(RequestItem.quantity), 0).label('total_requested'),
+        func.coalesce(func.sum(RequestItem.quantity * RequestItem.cost), 0).label('total_value'),
+        func.coalesce(func.avg(RequestItem.cost), 0).label('avg_cost')
+    ).select_from(Inventory).outerjoin(Category, Category.id == Inventory.category_id).outerjoin(
+        RequestItem
+    ).group_by(Inventory.id, Category.name).order_by(
+        func.coalesce(func.sum(RequestItem.quantity), 0).desc()
+    ).all()
+
+    # Category summary
+    category_summary = stock_monitor.category_totals()
+
+    return {
+        'inventory_sales': [row._asdict() for row in inventory_sales],
+        'category_summary': [row._asdict() for row in category_summary]
+    }
+
+
+@bp.route('/reports/<report>/refresh', methods=['POST'])
+@login_required
+def refresh_report(report):
+    if current_user.role not in ['admin', 'super_admin', 'school_manager']:
+        return redirect(url_for('main.dashboard'))
+    if report not in report_snapshots:
+        abort(404)
+
+    report_snapshots.build(report)
+    return redirect(url_for(f'reports.{report}'))
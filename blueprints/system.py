@@ -0,0 +1,142 @@
+"""
+Event stream, health check and error handlers
+"""
+import hmac
+import json
+import time
+from datetime import datetime
+from flask import Blueprint, Response, current_app, render_template, request, jsonify, stream_with_context
+from flask_login import login_required, current_user
+from sqlalchemy import text
+from extensions import db
+from events import event_bus
+from metrics import metrics
+from readiness import readiness
+from scoping import school_scope
+
+bp = Blueprint('system', __name__)
+
+
+def _cooperative_workers():
+    """True under gevent workers, where a sleeping stream only parks a greenlet"""
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched('socket')
+
+
+@bp.route('/events/stream')
+@login_required
+def event_stream():
+    """Server-sent events feed of request, comment and stock changes.
+
+    Under gevent workers the stream stays open for up to
+    EVENT_STREAM_MAX_DURATION, then the browser reconnects with
+    Last-Event-ID. Under sync and gthread workers an open stream would hold
+    a worker or thread the whole time, so each response sends the pending
+    events and closes, and the browser polls again after
+    EVENT_RECONNECT_INTERVAL.
+    """
+    last_id = request.headers.get('Last-Event-ID', type=int)
+    if last_id is None:
+        last_id = event_bus.latest_id()
+    user_id = current_user.id
+    role = current_user.role
+    school_id = school_scope.current()
+    poll_interval = current_app.config['EVENT_POLL_INTERVAL']
+    max_duration = current_app.config['EVENT_STREAM_MAX_DURATION']
+    keepalive_interval = current_app.config['EVENT_KEEPALIVE_INTERVAL']
+    headers = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+
+    def pending(cursor):
+        """Messages for the events after cursor that the user may see, and the new cursor"""
+        messages = []
+        for entry in event_bus.events_since(cursor):
+            cursor = entry.id
+            payload = json.loads(entry.payload)
+            if event_bus.visible_to(entry.kind, payload, user_id, role, school_id):
+                messages.append(f'id: {entry.id}\nevent: {entry.kind}\ndata: {entry.payload}\n\n')
+        # Advance the client's resume point past events it can't see
+        messages.append(f'id: {cursor}\n\n')
+        return messages, cursor
+
+    if not _cooperative_workers():
+        retry = int(current_app.config['EVENT_RECONNECT_INTERVAL'] * 1000)
+        messages = [f'id: {last_id}\n\n']
+        if event_bus.latest_id() > last_id:
+            messages, _ = pending(last_id)
+        return Response(f'retry: {retry}\n\n' + ''.join(messages), mimetype='text/event-stream', headers=headers)
+
+    def generate():
+        cursor = last_id
+        yield f'retry: {int(poll_interval * 1000)}\n\n'
+        started = last_write = time.monotonic()
+        while time.monotonic() - started < max_duration:
+            if event_bus.latest_id() > cursor:
+                messages, cursor = pending(cursor)
+                yield ''.join(messages)
+                last_write = time.monotonic()
+            elif time.monotonic() - last_write >= keepalive_interval:
+                yield ': keep-alive\n\n'
+                last_write = time.monotonic()
+            time.sleep(poll_interval)
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers=headers)
+
+
+@bp.route('/health')
+def health_check():
+    """Health check endpoint for monitoring"""
+    try:
+        # Check database connectivity
+        db.session.execute(text("SELECT 1"))
+        return jsonify({
+            'status': 'healthy',
+            'timestamp': datetime.utcnow().isoformat(),
+            'database': 'connected'
+        }), 200
+    except Exception as e:
+        return jsonify({
+            'status': 'unhealthy',
+            'timestamp': datetime.utcnow().isoformat(),
+            'error': str(e)
+        }), 500
+
+
+@bp.route('/livez')
+def liveness():
+    """Liveness probe: the worker is serving requests; no I/O"""
+    return Response('ok\n', mimetype='text/plain')
+
+
+@bp.route('/readyz')
+def readiness_check():
+    """Readiness probe: last result of the background readiness checks"""
+    status_code, payload = readiness.status()
+    return jsonify(payload), status_code
+
+
+@bp.route('/metrics')
+def prometheus_metrics():
+    """Prometheus scrape endpoint; keep it off the public proxy.
+
+    With METRICS_TOKEN set, scrapes must send it as a bearer token, since
+    port 8000 bypasses the nginx rule that denies /metrics.
+    """
+    token = current_app.config['METRICS_TOKEN']
+    if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return Response('Unauthorized\n', 401, {'WWW-Authenticate': 'Bearer'}, mimetype='text/plain')
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+
+# Error handlers
+@bp.app_errorhandler(404)
+def not_found_error(error):
+    return render_template('404.html'), 404
+
+
+@bp.app_errorhandler(500)
+def internal_error(error):
+    db.session.rollback()
+    return render_template('500.html'), 500
@@ -14,6 +14,8 @@ class Config:
     MAIL_USERNAME = os.environ.get('MAIL_USERNAME')
     MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD')
     MAIL_DEFAULT_SENDER = os.environ.get('MAIL_DEFAULT_SENDER')
+    MAIL_SUPPRESS_SEND = os.environ.get('MAIL_SUPPRESS_SEND', 'false').lower() in ['true', 'on', '1']
+    MAIL_SEND_THREADS = int(os.environ.get('MAIL_SEND_THREADS', 2))  # 0 sends inline, in the request
     
     # Database configuration
     DATABASE_SIZE_LIMIT = 5 * 1024 * 1024 * 1024  # 5GB
@@ -28,6 +30,79 @@ class Config:
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
     UPLOAD_FOLDER = 'uploads'
     
+    # Background jobs (exports, imports): see jobs.py
+    JOBS_DIR = os.environ.get('JOBS_DIR', 'jobs')  # result files, spooled exports and pending uploads
+    JOBS_INLINE = os.environ.get('JOBS_INLINE', 'false').lower() in ['true', 'on', '1']  # run in the request
+    JOB_POLL_INTERVAL = 1  # seconds an idle worker waits between queue checks
+    JOB_HEARTBEAT_INTERVAL = 10  # seconds
+    JOB_STALE_AFTER = timedelta(minutes=5)  # running jobs without a heartbeat are failed
+    JOB_RETENTION = timedelta(days=1)
+    # nginx internal location aliasing JOBS_DIR; unset, Flask sends files itself (see downloads.py)
+    DOWNLOADS_ACCEL_PREFIX = os.environ.get('DOWNLOADS_ACCEL_PREFIX')
+    
+    # Template rendering: see rendering.py
+    JINJA_BYTECODE_CACHE_DIR = os.environ.get('JINJA_BYTECODE_CACHE_DIR')  # compiled templates shared by workers
+    FRAGMENT_CACHE_TTL = 300  # seconds a cached fragment is served; 0 disables the cache
+    FRAGMENT_CACHE_MAX_SIZE = 32 * 1024 * 1024  # characters of cached HTML per worker
+    
+    # Report snapshots: see snapshots.py
+    REPORT_SNAPSHOTS = ['summary_report', 'sales_report', 'inventory_sales_summary']  # built by `flask report-snapshots`
+    REPORT_SNAPSHOT_MAX_AGE = timedelta(hours=int(os.environ.get('REPORT_SNAPSHOT_MAX_AGE_HOURS', 24)))
+    
+    # Comment thread pagination
+    COMMENTS_PAGE_SIZE = 50
+    COMMENTS_PAGE_SIZE_MAX = 200
+    
+    # Live event stream (SSE)
+    EVENT_POLL_INTERVAL = 2  # seconds between event table checks per process
+    EVENT_KEEPALIVE_INTERVAL = 15
+    EVENT_STREAM_MAX_DURATION = 300  # gevent: clients reconnect with Last-Event-ID
+    EVENT_RECONNECT_INTERVAL = 10  # sync/gthread: seconds between short polls
+    EVENT_RETENTION = timedelta(days=1)
+    
+    # Inventory: low-stock thresholds and reorder suggestions
+    LOW_STOCK_THRESHOLD = 10  # used when neither the item nor its category sets one
+    STOCK_VELOCITY_DAYS = 30  # consumption window for reorder suggestions
+    REORDER_COVER_DAYS = 14  # suggested orders cover this many days of usage
+    
+    # Password hashing: pbkdf2[:<hash>:<iterations>], scrypt[:<n>:<r>:<p>]
+    # or argon2[:<time>:<memory KiB>:<parallelism>] (needs argon2-cffi).
+    # Existing hashes are upgraded on the next successful login.
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000')
+    PASSWORD_HASH_THREADS = int(os.environ.get('PASSWORD_HASH_THREADS', os.cpu_count() or 1))
+    
+    # Identity cache for the Flask-Login user loader
+    USER_CACHE_SIZE = 1024
+    # Upper bound on serving a user changed outside the ORM (see identity.py)
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', 60))
+    
+    # SQL instrumentation: per-request query count and DB time, slow-query log
+    SQL_INSTRUMENTATION = True
+    SQL_STATS_HEADERS = None  # X-Query-Count/X-Query-Time-Ms headers; None = only in debug
+    SQL_STATS_SLOWEST = 5  # slowest statements kept per request
+    SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 200))
+    SLOW_REQUEST_QUERY_COUNT = int(os.environ.get('SLOW_REQUEST_QUERY_COUNT', 50))
+    
+    # /metrics: with several gunicorn workers each one writes its counters
+    # to METRICS_DIR so a scrape of any worker reports the totals.
+    METRICS_DIR = os.environ.get('METRICS_DIR')
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')  # scrapers send Authorization: Bearer <token>
+    METRICS_FLUSH_INTERVAL = 5  # seconds between snapshot writes per worker
+    
+    # /readyz: checks run in a background thread, probes read the last result
+    READINESS_CHECK_INTERVAL = int(os.environ.get('READINESS_CHECK_INTERVAL', 10))  # seconds
+    READINESS_STALE_AFTER = 60  # seconds without a fresh result before failing
+    READINESS_DB_LATENCY_MS = float(os.environ.get('READINESS_DB_LATENCY_MS', 500))  # write lock wait
+    READINESS_WAL_MAX_BYTES = 256 * 1024 * 1024
+    READINESS_DISK_FREE_WARN_BYTES = 1024 * 1024 * 1024
+    READINESS_DISK_FREE_MIN_BYTES = 100 * 1024 * 1024
+    READINESS_MAIL_BACKLOG_MAX = 100  # queued notification emails per worker
+    READINESS_MAIL_BACKLOG_AGE = 300  # seconds the oldest queued email may wait
+    
+    # Create tables and seed the super admin when the app starts. Production
+    # runs `flask --app wsgi init-db` once instead, so workers don't race on DDL.
+    INIT_DB_ON_STARTUP = os.environ.get('INIT_DB_ON_STARTUP', 'false').lower() in ['true', 'on', '1']
+    
     # Logging configuration
     LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
     LOG_FILE = os.environ.get('LOG_FILE', 'app.log')
@@ -35,7 +110,9 @@ class Config:
 class DevelopmentConfig(Config):
     """Development configuration"""
     DEBUG = True
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///resource_management.db'
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///resource_management.db')
+    INIT_DB_ON_STARTUP = True
+    JOBS_INLINE = True  # no `flask jobs-worker` needed with the dev server
     SQLALCHEMY_ENGINE_OPTIONS = {
         'pool_size': 10,
         'pool_timeout': 20,
@@ -54,8 +131,9 @@ class ProductionConfig(Config):
         'max_overflow': 30
     }
     
-    # Production security settings
-    SESSION_COOKIE_SECURE = True
+    # Production security settings (cookies only sent over HTTPS unless
+    # SESSION_COOKIE_SECURE=false, e.g. for a local load test over HTTP)
+    SESSION_COOKIE_SECURE = os.environ.get('SESSION_COOKIE_SECURE', 'true').lower() in ['true', 'on', '1']
     SESSION_COOKIE_HTTPONLY = True
     SESSION_COOKIE_SAMESITE = 'Strict'
     
@@ -68,6 +146,13 @@ class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False
+    MAIL_SUPPRESS_SEND = True
+    MAIL_SEND_THREADS = 0
+    JOBS_INLINE = True
+    REPORT_SNAPSHOT_MAX_AGE = timedelta(0)  # reports always show current data
+    FRAGMENT_CACHE_TTL = 0
+    INIT_DB_ON_STARTUP = True
+    PASSWORD_HASH_METHOD = 'pbkdf2:sha256:1000'
 
 # Configuration dictionary
 config = {
@@ -0,0 +1,178 @@
+"""
+Database management, maintenance and one-shot initialisation
+"""
+import os
+import sqlite3
+from datetime import datetime, timedelta
+from flask import current_app
+from flask_migrate import upgrade, stamp
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import Engine
+from extensions import db
+from models import User, Inventory, Request, Comment
+from events import event_bus
+from lookups import schools, categories
+from stock import stock_monitor
+
+
+@event.listens_for(Engine, 'connect')
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply per-connection SQLite tuning to every pooled connection"""
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA cache_size=65536")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
+class DatabaseManager:
+    def __init__(self, app):
+        self.app = app
+        self.db_files = [
+            'resource_management.db',
+            'resource_management2.db',
+            'resource_management3.db',
+            'resource_management4.db',
+            'resource_management5.db'
+        ]
+        self.current_db_index = 0
+        self.size_limit = app.config['DATABASE_SIZE_LIMIT']
+
+    def get_current_database(self):
+        return self.db_files[self.current_db_index]
+
+    def get_database_size(self, db_file):
+        if os.path.exists(db_file):
+            return os.path.getsize(db_file)
+        return 0
+
+    def check_and_switch_if_needed(self):
+        current_db = self.get_current_database()
+        current_size = self.get_database_size(current_db)
+        
+        if current_size >= self.size_limit:
+            print(f"Database {current_db} is full ({current_size} bytes). Switching to next database...")
+            self.switch_to_next_database()
+            return True
+        return False
+
+    def switch_to_next_database(self):
+        self.current_db_index = (self.current_db_index + 1) % len(self.db_files)
+        new_db = self.get_current_database()
+        print(f"Switched to database: {new_db}")
+        
+        # Update SQLAlchemy URI
+        self.app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{new_db}'
+        
+        # Recreate tables in new database
+        with self.app.app_context():
+            db.create_all()
+
+    def get_all_database_stats(self):
+        stats = []
+        for i, db_file in enumerate(self.db_files):
+            size = self.get_database_size(db_file)
+            is_current = (i == self.current_db_index)
+            stats.append({
+                'name': db_file,
+                'size': size,
+                'size_mb': round(size / (1024 * 1024), 2),
+                'is_current': is_current,
+                'is_full': size >= self.size_limit
+            })
+        return stats
+
+
+def get_db_manager():
+    return current_app.extensions['db_manager']
+
+
+# Database optimization functions
+def optimize_database():
+    db.session.execute(text("PRAGMA journal_mode=WAL"))
+    db.session.execute(text("ANALYZE"))
+    db.session.commit()
+
+
+def get_database_stats():
+    user_count = db.session.execute(text("SELECT COUNT(*) FROM user")).scalar()
+    inventory_count = db.session.execute(text("SELECT COUNT(*) FROM inventory")).scalar()
+    request_count = db.session.execute(text("SELECT COUNT(*) FROM request")).scalar()
+    comment_count = db.session.execute(text("SELECT COUNT(*) FROM comment")).scalar()
+    
+    tables = db.session.execute(text("SELECT name FROM sqlite_master WHERE type='table'")).fetchall()
+    
+    return {
+        'users': user_count,
+        'inventory': inventory_count,
+        'requests': request_count,
+        'comments': comment_count,
+        'tables': [table[0] for table in tables]
+    }
+
+
+def bulk_insert_inventory(data):
+    inventory_items = []
+    for _, row in data.iterrows():
+        category = row.get('category', 'General')
+        item = Inventory(
+            name=row['name'],
+            description=row.get('description', ''),
+            quantity=row['quantity'],
+            cost=row['cost'],
+            # blank spreadsheet cells come through as NaN
+            category_id=categories.id_for(category, create=True) if isinstance(category, str) else None
+        )
+        inventory_items.append(item)
+    
+    db.session.bulk_save_objects(inventory_items)
+    # Bulk saves skip the flush hook that maintains the stock flag and totals
+    stock_monitor.refresh()
+    stock_monitor.rebuild_totals()
+    db.session.commit()
+
+
+def cleanup_old_data():
+    # Delete requests older than 1 year
+    one_year_ago = datetime.utcnow() - timedelta(days=365)
+    old_requests = Request.query.filter(Request.created_at < one_year_ago).all()
+    for req in old_requests:
+        db.session.delete(req)
+    
+    # Delete comments older than 1 year
+    old_comments = Comment.query.filter(Comment.created_at < one_year_ago).all()
+    for comment in old_comments:
+        db.session.delete(comment)
+    
+    event_bus.prune()
+    db.session.commit()
+
+
+def init_database():
+    """Create the schema, seed the super admin and refresh planner statistics.
+
+    Run once per deployment (`flask --app wsgi init-db`) rather than in every
+    worker, so gunicorn workers don't race on DDL at boot. The schema comes
+    from the Alembic migrations; databases created by `db.create_all()`
+    before migrations existed are stamped at the baseline revision first.
+    """
+    tables = inspect(db.engine).get_table_names()
+    if 'user' in tables and 'alembic_version' not in tables:
+        stamp(revision='0001')
+    upgrade()
+    
+    # Create super admin if not exists
+    if not User.query.filter_by(role='super_admin').first():
+        super_admin = User(
+            username='admin',
+            email='admin@school.com',
+            role='super_admin',
+            school_id=schools.id_for('Main School', create=True)
+        )
+        super_admin.set_password('admin123')
+        db.session.add(super_admin)
+        db.session.commit()
+    
+    # Optimize database
+    optimize_database()
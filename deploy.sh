@@ -20,7 +20,7 @@ fi
 
 # Create necessary directories
 echo "📁 Creating necessary directories..."
-mkdir -p logs uploads data ssl
+mkdir -p logs uploads jobs data ssl
 
 # Generate SSL certificates (self-signed for development)
 echo "🔐 Generating SSL certificates..."
@@ -0,0 +1,50 @@
+"""
+Downloads of generated files, handed off to nginx
+
+Exports are written to the spool directory (JOBS_DIR, shared with the
+background jobs) and the view only checks access and names the file.
+With DOWNLOADS_ACCEL_PREFIX set, the response is an empty body with an
+X-Accel-Redirect header and nginx streams the file from an internal
+location that aliases the spool, so a slow client never holds a gunicorn
+worker or thread. Without it (development, no nginx) Flask sends the file
+itself. Spooled files are deleted with old jobs (JOB_RETENTION).
+"""
+import mimetypes
+import os
+import uuid
+from urllib.parse import quote
+from flask import current_app, send_file
+
+
+class Downloads:
+    def __init__(self, app=None):
+        self.directory = None
+        self.accel_prefix = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.directory = os.path.abspath(app.config['JOBS_DIR'])
+        self.accel_prefix = app.config['DOWNLOADS_ACCEL_PREFIX']
+        os.makedirs(self.directory, exist_ok=True)
+
+    def spool_path(self, prefix, suffix):
+        """A new, unique file in the spool directory"""
+        return os.path.join(self.directory, f'{prefix}-{uuid.uuid4().hex}{suffix}')
+
+    def send(self, path, download_name, mimetype=None):
+        """Send a spooled file as an attachment"""
+        if not self.accel_prefix:
+            return send_file(path, mimetype=mimetype, as_attachment=True, download_name=download_name)
+        relative = os.path.relpath(os.path.abspath(path), self.directory)
+        if relative.startswith(os.pardir):
+            raise ValueError(f'{path} is not in the spool directory')
+        response = current_app.response_class(
+            mimetype=mimetype or mimetypes.guess_type(download_name)[0] or 'application/octet-stream'
+        )
+        response.headers.set('Content-Disposition', 'attachment', filename=download_name)
+        response.headers['X-Accel-Redirect'] = self.accel_prefix + quote(relative.replace(os.sep, '/'))
+        return response
+
+
+downloads = Downloads()
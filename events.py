@@ -0,0 +1,77 @@
+"""
+Live event feed backing the server-sent events stream
+"""
+import json
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import func, select, delete
+from extensions import db
+from models import Event
+
+
+class EventBus:
+    """Cross-process event feed backed by the `event` table.
+
+    Publishers add a row inside their own transaction so the event commits
+    with the change it describes. Streams tail the table by primary key;
+    the newest id is cached per process so idle streams don't query.
+    """
+
+    ADMIN_ROLES = ('admin', 'super_admin', 'school_manager')
+
+    def __init__(self, app=None):
+        self.poll_interval = 2
+        self.retention = None
+        self._lock = threading.Lock()
+        self._latest_id = None
+        self._checked_at = 0.0
+        self._published = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.poll_interval = app.config['EVENT_POLL_INTERVAL']
+        self.retention = app.config['EVENT_RETENTION']
+
+    def publish(self, kind, **payload):
+        db.session.add(Event(kind=kind, payload=json.dumps(payload)))
+        self._published += 1
+        if self._published % 500 == 0:
+            self.prune()
+
+    def prune(self):
+        cutoff = datetime.utcnow() - self.retention
+        db.session.execute(delete(Event).where(Event.created_at < cutoff))
+
+    def latest_id(self):
+        now = time.monotonic()
+        with self._lock:
+            if self._latest_id is None or now - self._checked_at >= self.poll_interval:
+                # Short-lived connection: a long-running session would pin
+                # an old SQLite read snapshot and never see new rows.
+                with db.engine.connect() as conn:
+                    self._latest_id = conn.execute(select(func.max(Event.id))).scalar() or 0
+                self._checked_at = now
+            return self._latest_id
+
+    def events_since(self, last_id, limit=100):
+        with db.engine.connect() as conn:
+            return conn.execute(
+                select(Event.id, Event.kind, Event.payload)
+                .where(Event.id > last_id)
+                .order_by(Event.id)
+                .limit(limit)
+            ).all()
+
+    def visible_to(self, kind, payload, user_id, role, school_id=None):
+        if role in self.ADMIN_ROLES:
+            # Events without a school (stock) concern every school
+            return school_id is None or payload.get('school_id', school_id) == school_id
+        if kind == 'stock_low':
+            return False
+        return payload.get('user_id') == user_id
+
+
+event_bus = EventBus()
+
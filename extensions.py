@@ -0,0 +1,81 @@
+"""
+Flask extension instances shared by the application modules
+"""
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from flask_sqlalchemy import SQLAlchemy
+from flask_login import LoginManager
+from flask_mail import Mail
+from flask_migrate import Migrate
+from passwords import PasswordHasher
+from metrics import metrics
+
+
+class TimedMail(Mail):
+    """Flask-Mail that records each send's duration for /metrics"""
+
+    _executor = None
+
+    def __init__(self, app=None):
+        self._queued = {}  # ticket -> monotonic time the message was handed over
+        self._tickets = itertools.count()
+        self._lock = threading.Lock()
+        super().__init__(app)
+
+    def init_app(self, app):
+        super().init_app(app)
+        threads = app.config.get('MAIL_SEND_THREADS', 0)
+        if threads and self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='mail')
+
+    def send_later(self, message):
+        """Send from a background thread so the request doesn't wait on SMTP.
+
+        Failures are logged, not raised. Under gevent the thread is a
+        greenlet and the SMTP socket yields while it waits. With
+        MAIL_SEND_THREADS = 0 the message is sent inline.
+        """
+        app = current_app._get_current_object()
+        if self._executor is None:
+            self._send_logged(app, message)
+            return
+        ticket = next(self._tickets)
+        with self._lock:
+            self._queued[ticket] = time.monotonic()
+        self._executor.submit(self._send_logged, app, message, ticket)
+
+    def backlog(self):
+        """(messages waiting or being sent, seconds the oldest has waited) in this process"""
+        with self._lock:
+            oldest = min(self._queued.values(), default=None)
+            return len(self._queued), (time.monotonic() - oldest if oldest is not None else 0.0)
+
+    def _send_logged(self, app, message, ticket=None):
+        with app.app_context():
+            try:
+                self.send(message)
+            except Exception as e:
+                app.logger.error(f"Failed to send email: {e}")
+            finally:
+                if ticket is not None:
+                    with self._lock:
+                        self._queued.pop(ticket, None)
+
+    def send(self, message):
+        started = time.perf_counter()
+        try:
+            super().send(message)
+        except Exception:
+            metrics.observe_email(time.perf_counter() - started, 'error')
+            raise
+        metrics.observe_email(time.perf_counter() - started, 'sent')
+
+
+db = SQLAlchemy()
+login_manager = LoginManager()
+mail = TimedMail()
+migrate = Migrate()
+password_hasher = PasswordHasher()
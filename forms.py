@@ -0,0 +1,49 @@
+"""
+WTForms definitions
+"""
+from flask_wtf import FlaskForm
+from wtforms import StringField, PasswordField, SubmitField, SelectField, TextAreaField, IntegerField
+from wtforms.validators import DataRequired, Email, Length, EqualTo, NumberRange, Optional
+
+
+class LoginForm(FlaskForm):
+    username = StringField('Username', validators=[DataRequired()])
+    password = PasswordField('Password', validators=[DataRequired()])
+    submit = SubmitField('Login')
+
+
+class UserForm(FlaskForm):
+    username = StringField('Username', validators=[DataRequired(), Length(min=3, max=80)])
+    email = StringField('Email', validators=[DataRequired(), Email()])
+    password = PasswordField('Password', validators=[DataRequired(), Length(min=6)])
+    confirm_password = PasswordField('Confirm Password', validators=[DataRequired(), EqualTo('password')])
+    role = SelectField('Role', choices=[
+        ('user', 'User'),
+        ('admin', 'School Admin'),
+        ('school_manager', 'School Manager'),
+        ('super_admin', 'Super Admin')
+    ])
+    school = StringField('School')
+    submit = SubmitField('Create User')
+
+
+class CommentForm(FlaskForm):
+    comment = TextAreaField('Comment', validators=[DataRequired()])
+    submit = SubmitField('Add Comment')
+
+
+class InventoryForm(FlaskForm):
+    name = StringField('Name', validators=[DataRequired()])
+    description = TextAreaField('Description')
+    quantity = IntegerField('Quantity', validators=[DataRequired()])
+    cost = StringField('Cost', validators=[DataRequired()])
+    category = StringField('Category')
+    reorder_threshold = IntegerField('Reorder Threshold', validators=[Optional(), NumberRange(min=0)])
+
+
+class EmailSettingsForm(FlaskForm):
+    smtp_server = StringField('SMTP Server', validators=[DataRequired()])
+    smtp_port = IntegerField('SMTP Port', validators=[DataRequired()])
+    username = StringField('Username', validators=[DataRequired()])
+    password = PasswordField('Password', validators=[DataRequired()])
+    use_tls = SelectField('Use TLS', choices=[(True, 'Yes'), (False, 'No')])
@@ -0,0 +1,59 @@
+"""
+Gunicorn settings, read from the environment
+
+`gunicorn -c gunicorn.conf.py wsgi:app` (gunicorn also picks this file up
+from the working directory on its own). Command-line flags override it.
+
+GUNICORN_WORKER_CLASS picks the serving mode:
+    gthread (default)  each worker runs GUNICORN_THREADS requests at once, so
+                       a slow SMTP call or export holds one thread, not a worker
+    gevent             each worker runs up to GUNICORN_WORKER_CONNECTIONS
+                       requests as greenlets; sockets, sleeps and the event
+                       stream yield while they wait (needs gevent installed)
+    sync               one request per worker, as before
+
+JOB_WORKERS `flask jobs-worker` processes (default 1, 0 to run them
+elsewhere) are started with the server to run queued exports and imports.
+"""
+import os
+import subprocess
+import sys
+
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+workers = int(os.environ.get('GUNICORN_WORKERS', 4))
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 1000))
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+# With gthread this is the worker heartbeat, not a per-request limit, so a
+# long export no longer gets its worker killed. Under gevent CPU-bound work
+# (building a workbook) still blocks the heartbeat of its worker.
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+graceful_timeout = 30
+keepalive = 5  # nginx reuses upstream connections
+
+
+job_workers = int(os.environ.get('JOB_WORKERS', 1))
+_job_processes = []
+
+
+def when_ready(server):
+    env = dict(os.environ)
+    here = os.path.dirname(os.path.abspath(__file__))
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [here, env.get('PYTHONPATH')]))
+    for _ in range(job_workers):
+        _job_processes.append(subprocess.Popen(
+            [sys.executable, '-m', 'flask', '--app', 'wsgi', 'jobs-worker'], env=env
+        ))
+    if job_workers:
+        server.log.info('Started %d jobs worker(s)', job_workers)
+
+
+def on_exit(server):
+    for process in _job_processes:
+        process.terminate()
+    for process in _job_processes:
+        try:
+            process.wait(timeout=graceful_timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
@@ -0,0 +1,108 @@
+"""
+HTTP caching: fingerprinted static assets and conditional responses
+
+`flask build-assets` copies each file in ASSETS to
+static/dist/<path>.<content hash>.<ext>, next to a gzip copy (and a brotli
+copy when the brotli package is installed), and records the names in
+static/dist/manifest.json. Templates link assets with asset_url(); the
+URL changes whenever the content does, so the files are served with a
+one-year immutable Cache-Control and nginx sends the precompressed copy
+as is (gzip_static). Without a manifest (development) asset_url() points
+at the source file and Flask revalidates it on every load.
+
+JSON responses and report pages get an ETag, and a repeat GET whose
+If-None-Match matches is answered 304 Not Modified without a body. They
+stay private and are revalidated every time, since they depend on who is
+signed in.
+"""
+import gzip
+import hashlib
+import json
+import os
+from flask import request, url_for
+
+try:
+    import brotli
+except ImportError:  # optional: only gzip variants are written
+    brotli = None
+
+ASSETS = ('css/app.css', 'js/app.js')
+CONDITIONAL_BLUEPRINTS = ('reports',)
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+
+class HttpCache:
+    def __init__(self, app=None):
+        self.manifest = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.manifest = self.load_manifest(app.static_folder)
+        app.add_template_global(self.asset_url, 'asset_url')
+
+        @app.after_request
+        def cache_headers(response):
+            if request.endpoint == 'static':
+                if request.view_args['filename'].startswith('dist/'):
+                    response.cache_control.no_cache = None
+                    response.cache_control.public = True
+                    response.cache_control.max_age = IMMUTABLE_MAX_AGE
+                    response.cache_control.immutable = True
+                return response
+            if self._conditional(response):
+                response.add_etag()
+                response.cache_control.private = True
+                response.cache_control.no_cache = True
+                response.make_conditional(request)
+            return response
+
+    def asset_url(self, filename):
+        """URL of a static asset, fingerprinted once `flask build-assets` has run"""
+        return url_for('static', filename=self.manifest.get(filename, filename))
+
+    def load_manifest(self, static_folder):
+        path = os.path.join(static_folder, 'dist', 'manifest.json')
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+    def build(self, static_folder):
+        """Write fingerprinted, precompressed copies of ASSETS; returns the manifest"""
+        manifest = {}
+        for filename in ASSETS:
+            with open(os.path.join(static_folder, filename), 'rb') as f:
+                data = f.read()
+            stem, extension = os.path.splitext(filename)
+            fingerprinted = f'dist/{stem}.{hashlib.sha256(data).hexdigest()[:12]}{extension}'
+            target = os.path.join(static_folder, fingerprinted)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            variants = {'': data, '.gz': gzip.compress(data, 9, mtime=0)}
+            if brotli is not None:
+                variants['.br'] = brotli.compress(data)
+            for suffix, content in variants.items():
+                with open(target + suffix, 'wb') as f:
+                    f.write(content)
+            manifest[filename] = fingerprinted
+
+        # Replace the manifest in one step: running workers may be reading it
+        path = os.path.join(static_folder, 'dist', 'manifest.json')
+        with open(path + '.tmp', 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(path + '.tmp', path)
+        self.manifest = manifest
+        return manifest
+
+    def _conditional(self, response):
+        return (
+            request.method == 'GET'
+            and response.status_code == 200
+            and not response.is_streamed
+            and not response.direct_passthrough
+            and 'Content-Disposition' not in response.headers
+            and (response.is_json or request.blueprint in CONDITIONAL_BLUEPRINTS)
+        )
+
+
+http_cache = HttpCache()
@@ -0,0 +1,96 @@
+"""
+Flask-Login user loader backed by an in-process identity cache
+"""
+import threading
+import time
+from collections import OrderedDict
+from flask_login import UserMixin
+from sqlalchemy import event
+from extensions import login_manager
+from models import User
+from rendering import rendering
+
+
+class CachedUser(UserMixin):
+    """Detached, read-only identity used as current_user"""
+
+    def __init__(self, user):
+        self.id = user.id
+        self.username = user.username
+        self.email = user.email
+        self.role = user.role
+        self.school_id = user.school_id
+        self._is_active = user.is_active
+
+    @property
+    def is_active(self):
+        return self._is_active
+
+
+class UserIdentityCache:
+    """Bounded LRU of CachedUser records with a TTL.
+
+    The cache is per process. Each entry remembers the user table's
+    data_version (see rendering.py) it was loaded at, and an entry from an
+    older version is reloaded, so an ORM write to any user in any worker
+    reaches every worker on its next request. Edits that bypass the ORM are
+    picked up within the TTL.
+    """
+
+    def __init__(self, max_size=1024, ttl=60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.max_size = app.config['USER_CACHE_SIZE']
+        self.ttl = app.config['USER_CACHE_TTL']
+
+    def get(self, user_id, version):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            record, expires, loaded_at = entry
+            if expires < time.monotonic() or loaded_at != version:
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return record
+
+    def put(self, record, version):
+        with self._lock:
+            self._entries[record.id] = (record, time.monotonic() + self.ttl, version)
+            self._entries.move_to_end(record.id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+
+user_cache = UserIdentityCache()
+
+
+@login_manager.user_loader
+def load_user(user_id):
+    user_id = int(user_id)
+    # Read before the user, so a change committed in between only costs a reload
+    version, = rendering.data_version('user')
+    record = user_cache.get(user_id, version)
+    if record is None:
+        # Unscoped: users aren't scoped, and resolving the scope would come back here
+        user = User.query.execution_options(unscoped=True).get(user_id)
+        if user is None:
+            return None
+        record = CachedUser(user)
+        user_cache.put(record, version)
+    return record
+
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def invalidate_cached_user(mapper, connection, target):
+    user_cache.invalidate(target.id)
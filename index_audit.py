@@ -0,0 +1,129 @@
+"""
+Index audit: replay the application's queries through EXPLAIN QUERY PLAN
+
+The audit drives the read-only routes with a test client logged in as a
+super admin, captures every SELECT the ORM emits, and asks SQLite how it
+would execute each one. Indexes that no plan touches are reported as
+unused; tables that are scanned without an index are reported as missing
+index candidates.
+"""
+import re
+from collections import Counter, defaultdict
+from flask import current_app
+from sqlalchemy import event, text
+from extensions import db
+from models import User, Request
+
+INDEX_USE = re.compile(r'USING (?:COVERING )?INDEX (\w+)')
+TABLE_SCAN = re.compile(r'^SCAN (\w+)(?: AS \w+)?$')
+
+# Routes with side effects or that never finish (event stream)
+SKIPPED_ENDPOINTS = {
+    'static',
+    'auth.logout',
+    'auth.session_timeout',
+    'admin.update_request_status',
+    'admin.optimize_database_route',
+    'admin.cleanup_database',
+    'admin.switch_database',
+    'system.event_stream',
+}
+
+
+def _route_urls(app, sample_args):
+    urls = []
+    for rule in app.url_map.iter_rules():
+        if rule.endpoint in SKIPPED_ENDPOINTS or 'GET' not in rule.methods:
+            continue
+        if not set(rule.arguments) <= set(sample_args):
+            continue
+        urls.append(rule.build({name: sample_args[name] for name in rule.arguments})[1])
+    return sorted(urls)
+
+
+def capture_queries(app):
+    """Run the read-only routes and return {(sql, params): [urls]}"""
+    admin = User.query.filter_by(role='super_admin').first()
+    latest_request = db.session.query(Request.id).order_by(Request.id.desc()).first()
+    sample_args = {'request_id': latest_request[0] if latest_request else 1}
+
+    captured = defaultdict(list)
+    current_url = [None]
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and not executemany:
+            captured[(statement, tuple(parameters or ()))].append(current_url[0])
+
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(admin.id)
+        sess['_fresh'] = True
+
+    # Let route errors reach the audit loop instead of being logged as 500s
+    propagate = app.config['PROPAGATE_EXCEPTIONS']
+    app.config['PROPAGATE_EXCEPTIONS'] = True
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        for url in _route_urls(app, sample_args):
+            current_url[0] = url
+            try:
+                client.get(url)
+            except Exception as e:
+                current_app.logger.warning(f'Index audit: {url} failed: {e}')
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+        app.config['PROPAGATE_EXCEPTIONS'] = propagate
+    return captured
+
+
+def explain(statement, parameters):
+    with db.engine.connect() as conn:
+        rows = conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).fetchall()
+    return [row[-1] for row in rows]
+
+
+def run_audit(app):
+    captured = capture_queries(app)
+
+    declared = {
+        name: table for name, table in db.session.execute(text(
+            "SELECT name, tbl_name FROM sqlite_master "
+            "WHERE type = 'index' AND name NOT LIKE 'sqlite_autoindex%' "
+            "AND sql NOT LIKE 'CREATE UNIQUE%'"
+        ))
+    }
+
+    index_hits = Counter()
+    scans = defaultdict(set)
+    for (statement, parameters), urls in captured.items():
+        try:
+            plan = explain(statement, parameters)
+        except Exception as e:
+            current_app.logger.warning(f'Index audit: cannot explain query: {e}')
+            continue
+        for detail in plan:
+            for index_name in INDEX_USE.findall(detail):
+                index_hits[index_name] += len(urls)
+            match = TABLE_SCAN.match(detail)
+            if match:
+                scans[match.group(1)].update(url for url in urls if url)
+
+    return {
+        'statements': len(captured),
+        'used': {name: index_hits[name] for name in sorted(declared) if index_hits[name]},
+        'unused': {name: declared[name] for name in sorted(declared) if not index_hits[name]},
+        'full_scans': {table: sorted(urls) for table, urls in sorted(scans.items())},
+    }
+
+
+def format_report(report):
+    lines = [f"Explained {report['statements']} distinct statements", '', 'Indexes used (plan hits):']
+    lines += [f'  {name:<40} {hits}' for name, hits in report['used'].items()] or ['  (none)']
+    lines += ['', 'Unused indexes (no captured plan uses them; check write paths before dropping):']
+    lines += [f'  {name:<40} on {table}' for name, table in report['unused'].items()] or ['  (none)']
+    lines += ['', 'Full table scans (missing index candidates):']
+    for table, urls in report['full_scans'].items():
+        lines.append(f'  {table}: ' + ', '.join(urls))
+    if not report['full_scans']:
+        lines.append('  (none)')
+    return '\n'.join(lines)
@@ -0,0 +1,229 @@
+"""
+Background jobs: long exports and imports run outside the HTTP request
+
+A view enqueues a Job row and sends the browser to the job's page, which
+polls its progress. `flask jobs-worker` processes (gunicorn.conf.py starts
+JOB_WORKERS of them next to the web workers) claim queued jobs oldest
+first, run the handler registered for the job's kind and keep the file it
+writes under JOBS_DIR for download. A running job's heartbeat is refreshed
+while its handler works, so jobs left behind by a worker that died are
+marked failed. Jobs and files older than JOB_RETENTION are removed.
+Workers also touch a heartbeat file in JOBS_DIR, and /readyz fails when
+none has for JOB_STALE_AFTER. With JOBS_INLINE (development, testing and
+hosts that can't run a worker) a job runs inside the request that
+enqueued it, and requests sweep old jobs and files instead.
+"""
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import delete, select, update
+from extensions import db
+from models import Job
+
+SWEEP_INTERVAL = 60  # seconds between sweeps per process
+WORKER_HEARTBEAT = '.worker-heartbeat'  # in JOBS_DIR, touched by running workers
+
+
+class JobContext:
+    """Handed to a job handler: its parameters and a way to report progress"""
+
+    def __init__(self, queue, job):
+        self.id = job.id
+        self.user_id = job.user_id
+        self.params = json.loads(job.params)
+        self._queue = queue
+
+    def progress(self, percent, message=None):
+        """Record progress on a separate connection, so pollers see it at once.
+
+        Don't call it while the handler's session holds uncommitted writes:
+        on SQLite it would wait on the handler's own write lock.
+        """
+        values = {'progress': max(0, min(int(percent), 100)), 'heartbeat_at': datetime.utcnow()}
+        if message is not None:
+            values['message'] = message[:255]
+        self._queue.update(self.id, **values)
+
+    def output_path(self, suffix):
+        """Where the handler should write its result file"""
+        return os.path.join(self._queue.directory, f'job-{self.id}{suffix}')
+
+
+class JobQueue:
+    """Job table plus the worker loop that drains it.
+
+    Handlers are registered with @job_queue.task(kind) and return either
+    None or a (path, download name) tuple for the file they wrote.
+    """
+
+    def __init__(self, app=None):
+        self.directory = None
+        self.inline = False
+        self.poll_interval = 1
+        self.heartbeat_interval = 10
+        self.stale_after = None
+        self.retention = None
+        self._handlers = {}
+        self._swept_at = 0.0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.directory = os.path.abspath(app.config['JOBS_DIR'])
+        self.inline = app.config['JOBS_INLINE']
+        self.poll_interval = app.config['JOB_POLL_INTERVAL']
+        self.heartbeat_interval = app.config['JOB_HEARTBEAT_INTERVAL']
+        self.stale_after = app.config['JOB_STALE_AFTER']
+        self.retention = app.config['JOB_RETENTION']
+        os.makedirs(self.directory, exist_ok=True)
+        if self.inline:
+            # No worker sweeps in this mode, so requests do
+            app.after_request(self._sweep_when_due)
+
+    def task(self, kind):
+        def register(handler):
+            self._handlers[kind] = handler
+            return handler
+        return register
+
+    def enqueue(self, kind, user_id, **params):
+        """Queue a job (committing it) and return its id"""
+        job = Job(kind=kind, user_id=user_id, params=json.dumps(params))
+        db.session.add(job)
+        db.session.commit()
+        if self.inline:
+            self.update(job.id, status='running', started_at=datetime.utcnow())
+            self.run(job.id)
+        return job.id
+
+    def update(self, job_id, **values):
+        with db.engine.begin() as conn:
+            conn.execute(update(Job).where(Job.id == job_id).values(**values))
+
+    def claim(self):
+        """Mark the oldest queued job running; returns its id, or None if there is none"""
+        while True:
+            with db.engine.begin() as conn:
+                job_id = conn.execute(
+                    select(Job.id).where(Job.status == 'queued').order_by(Job.id).limit(1)
+                ).scalar()
+                if job_id is None:
+                    return None
+                now = datetime.utcnow()
+                claimed = conn.execute(
+                    update(Job).where(Job.id == job_id, Job.status == 'queued')
+                    .values(status='running', started_at=now, heartbeat_at=now)
+                ).rowcount
+            if claimed:
+                return job_id
+
+    def run(self, job_id):
+        job = db.session.get(Job, job_id)
+        handler = self._handlers.get(job.kind)
+        try:
+            if handler is None:
+                raise LookupError(f'No handler for {job.kind} jobs')
+            result = handler(JobContext(self, job))
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.exception(f'Job {job_id} ({job.kind}) failed')
+            self.update(job_id, status='failed', message=str(e)[:255], finished_at=datetime.utcnow())
+            return
+        path, name = result or (None, None)
+        self.update(job_id, status='done', progress=100, result_path=path, result_name=name,
+                    finished_at=datetime.utcnow())
+
+    def work(self, once=False):
+        """Run jobs until interrupted, or with `once` until the queue is empty"""
+        app = current_app._get_current_object()
+        swept_at = beat_at = 0.0
+        while True:
+            if time.monotonic() - beat_at >= self.heartbeat_interval:
+                self._touch(os.path.join(self.directory, WORKER_HEARTBEAT))
+                beat_at = time.monotonic()
+            if time.monotonic() - swept_at >= SWEEP_INTERVAL:
+                self.sweep()
+                swept_at = time.monotonic()
+            job_id = self.claim()
+            if job_id is None:
+                if once:
+                    return
+                time.sleep(self.poll_interval)
+                continue
+            stop = threading.Event()
+            heartbeat = threading.Thread(target=self._heartbeat, args=(app, job_id, stop),
+                                         name=f'job-{job_id}-heartbeat', daemon=True)
+            heartbeat.start()
+            try:
+                # A fresh app context per job: its own session and school scope
+                with app.app_context():
+                    self.run(job_id)
+            finally:
+                stop.set()
+                heartbeat.join()
+
+    def worker_age(self):
+        """Seconds since a jobs worker last touched its heartbeat file, or None if none ever has"""
+        try:
+            return max(time.time() - os.path.getmtime(os.path.join(self.directory, WORKER_HEARTBEAT)), 0)
+        except OSError:
+            return None
+
+    def _touch(self, path):
+        with open(path, 'a'):
+            os.utime(path)
+
+    def _sweep_when_due(self, response):
+        if time.monotonic() - self._swept_at >= SWEEP_INTERVAL:
+            self._swept_at = time.monotonic()
+            try:
+                self.sweep()
+            except Exception as e:
+                current_app.logger.error(f'Job sweep failed: {e}')
+        return response
+
+    def _heartbeat(self, app, job_id, stop):
+        with app.app_context():
+            while not stop.wait(self.heartbeat_interval):
+                try:
+                    self.update(job_id, heartbeat_at=datetime.utcnow())
+                except Exception as e:
+                    # e.g. the handler holds the SQLite write lock; retry next beat
+                    app.logger.debug(f'Job {job_id} heartbeat skipped: {e}')
+
+    def sweep(self):
+        """Fail jobs whose worker stopped; delete old jobs and files. Returns jobs deleted."""
+        now = datetime.utcnow()
+        with db.engine.begin() as conn:
+            conn.execute(
+                update(Job)
+                .where(Job.status == 'running', Job.heartbeat_at < now - self.stale_after)
+                .values(status='failed', message='The worker stopped before the job finished', finished_at=now)
+            )
+            deleted = conn.execute(
+                delete(Job).where(Job.created_at < now - self.retention, Job.status != 'running')
+            ).rowcount
+        cutoff = time.time() - self.retention.total_seconds()
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+        return deleted
+
+    def describe(self, job):
+        """JSON-ready status of a job"""
+        return {
+            'id': job.id,
+            'kind': job.kind,
+            'status': job.status,
+            'progress': job.progress,
+            'message': job.message,
+            'download': job.status == 'done' and job.result_path is not None,
+            'created_at': job.created_at.isoformat(),
+            'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        }
+
+
+job_queue = JobQueue()
@@ -0,0 +1,58 @@
+"""
+Name lookups for the School and Category tables
+
+Users and inventory items reference their school and category by integer
+id. Names typed into forms or spreadsheets are matched after collapsing
+whitespace and ignoring case, so "office  supplies" and "Office Supplies"
+share one row instead of splitting a category in two. Committed name-to-id
+pairs are cached per process; lookup rows are never renamed or deleted, so
+the cache needs no invalidation.
+"""
+import threading
+from sqlalchemy import func, select
+from extensions import db
+from models import School, Category
+
+
+def normalize(name):
+    """Collapse runs of whitespace; None and blank names become ''"""
+    return ' '.join(str(name).split()) if name is not None else ''
+
+
+class Lookup:
+    def __init__(self, model):
+        self.model = model
+        self._ids = {}
+        self._lock = threading.Lock()
+
+    def id_for(self, name, create=False):
+        """Id of the named row, optionally adding it in the current transaction"""
+        name = normalize(name)
+        if not name:
+            return None
+        key = name.lower()
+        with self._lock:
+            if key in self._ids:
+                return self._ids[key]
+
+        created = db.session.info.setdefault('lookup_created', set())
+        row_id = db.session.execute(
+            select(self.model.id).where(func.lower(self.model.name) == key)
+        ).scalar()
+        if row_id is None:
+            if not create:
+                return None
+            row = self.model(name=name)
+            db.session.add(row)
+            db.session.flush()
+            row_id = row.id
+            # Not cached until a later request sees it committed
+            created.add((self.model, key))
+        elif (self.model, key) not in created:
+            with self._lock:
+                self._ids[key] = row_id
+        return row_id
+
+
+schools = Lookup(School)
+categories = Lookup(Category)
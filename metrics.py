@@ -0,0 +1,259 @@
+"""
+Prometheus text-format metrics shared across gunicorn workers
+
+Each worker keeps its counters and histograms in memory and, at most every
+METRICS_FLUSH_INTERVAL seconds, writes a snapshot to METRICS_DIR/<pid>.json.
+A scrape merges the scraping worker's live state with the other workers'
+snapshots. The database is only asked for row counts, which SQLite keeps in
+sqlite_stat1 as of the last ANALYZE, and for the low-stock count, which
+reads the partial index over flagged items; no table is scanned per scrape.
+"""
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from flask import current_app, g, request
+from sqlalchemy import bindparam, text
+from sqlalchemy.exc import OperationalError
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+EMAIL_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+RENDER_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+ROW_COUNT_TABLES = ('user', 'inventory', 'request', 'request_item', 'comment')
+
+HELP = {
+    'http_requests_total': ('counter', 'HTTP requests by endpoint, method and status'),
+    'http_request_duration_seconds': ('histogram', 'Time spent handling a request'),
+    'email_send_duration_seconds': ('histogram', 'Time spent sending one email'),
+    'template_render_duration_seconds': ('histogram', 'Time spent rendering a template, by template'),
+    'template_fragment_cache_total': ('counter', 'Template fragment cache lookups by fragment and result'),
+    'db_pool_checked_out': ('gauge', 'Connections checked out of the SQLAlchemy pool'),
+    'db_pool_overflow': ('gauge', 'Connections opened beyond the pool size'),
+    'db_pool_size': ('gauge', 'Configured SQLAlchemy pool size'),
+    'sqlite_database_bytes': ('gauge', 'Size of the SQLite database file'),
+    'sqlite_wal_bytes': ('gauge', 'Size of the SQLite write-ahead log'),
+    'table_rows': ('gauge', 'Rows per table as of the last ANALYZE'),
+    'inventory_low_stock_items': ('gauge', 'Inventory items below their low-stock threshold'),
+}
+
+
+class Metrics:
+    """Process-local counters and histograms with file-based sharing"""
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._counters = defaultdict(float)
+        self._histograms = {}
+        self._last_flush = 0.0
+        self.directory = None
+        self.flush_interval = 5
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.directory = app.config['METRICS_DIR']
+        self.flush_interval = app.config['METRICS_FLUSH_INTERVAL']
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+        @app.before_request
+        def start_request_timer():
+            g.request_started = time.perf_counter()
+
+        @app.after_request
+        def record_request(response):
+            started = g.get('request_started')
+            if started is not None:
+                endpoint = request.url_rule.endpoint if request.url_rule else 'unmatched'
+                self.inc('http_requests_total', endpoint=endpoint, method=request.method,
+                         status=str(response.status_code))
+                self.observe('http_request_duration_seconds', time.perf_counter() - started,
+                             LATENCY_BUCKETS, endpoint=endpoint)
+                self.flush()
+            return response
+
+    def inc(self, name, amount=1, **labels):
+        with self._lock:
+            self._counters[(name, _label_key(labels))] += amount
+
+    def observe(self, name, value, buckets, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [list(buckets), [0] * len(buckets), 0.0, 0]
+            for i, bound in enumerate(histogram[0]):
+                if value <= bound:
+                    histogram[1][i] += 1
+                    break
+            histogram[2] += value
+            histogram[3] += 1
+
+    def observe_email(self, duration, outcome):
+        self.observe('email_send_duration_seconds', duration, EMAIL_BUCKETS, outcome=outcome)
+
+    def observe_render(self, duration, template):
+        self.observe('template_render_duration_seconds', duration, RENDER_BUCKETS, template=template)
+
+    def flush(self, force=False):
+        """Write this worker's snapshot for the other workers to read"""
+        if not self.directory:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_flush < self.flush_interval:
+            return
+        self._last_flush = now
+        path = os.path.join(self.directory, f'{os.getpid()}.json')
+        with open(path + '.tmp', 'w') as f:
+            json.dump(self._snapshot(), f)
+        os.replace(path + '.tmp', path)
+
+    def render(self):
+        """Return all metrics in the Prometheus text exposition format"""
+        counters = defaultdict(float)
+        histograms = {}
+        gauges = defaultdict(float)
+        for snapshot in self._snapshots():
+            for name, labels, value in snapshot['counters']:
+                counters[(name, tuple(map(tuple, labels)))] += value
+            for name, labels, buckets, counts, total, count in snapshot['histograms']:
+                key = (name, tuple(map(tuple, labels)))
+                merged = histograms.setdefault(key, [buckets, [0] * len(buckets), 0.0, 0])
+                merged[1] = [a + b for a, b in zip(merged[1], counts)]
+                merged[2] += total
+                merged[3] += count
+            for name, labels, value in snapshot['gauges']:
+                gauges[(name, tuple(map(tuple, labels)))] += value
+
+        gauges.update(self._storage_gauges())
+
+        lines = []
+        for name, (kind, description) in HELP.items():
+            lines += [f'# HELP {name} {description}', f'# TYPE {name} {kind}']
+            if kind == 'histogram':
+                for (metric, labels), (buckets, counts, total, count) in sorted(histograms.items()):
+                    if metric != name:
+                        continue
+                    cumulative = 0
+                    for bound, bucket_count in zip(buckets, counts):
+                        cumulative += bucket_count
+                        lines.append(f'{name}_bucket{_format_labels(labels + (("le", repr(float(bound))),))} {cumulative}')
+                    lines.append(f'{name}_bucket{_format_labels(labels + (("le", "+Inf"),))} {count}')
+                    lines.append(f'{name}_sum{_format_labels(labels)} {total}')
+                    lines.append(f'{name}_count{_format_labels(labels)} {count}')
+            else:
+                source = counters if kind == 'counter' else gauges
+                for (metric, labels), value in sorted(source.items()):
+                    if metric == name:
+                        lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+    def _snapshot(self):
+        with self._lock:
+            counters = [[name, labels, value] for (name, labels), value in self._counters.items()]
+            histograms = [[name, labels, h[0], list(h[1]), h[2], h[3]]
+                          for (name, labels), h in self._histograms.items()]
+        return {
+            'pid': os.getpid(),
+            'counters': counters,
+            'histograms': histograms,
+            'gauges': [[name, labels, value] for (name, labels), value in self._pool_gauges().items()],
+        }
+
+    def _snapshots(self):
+        """This worker's live state plus the saved state of the others.
+
+        Counters and histograms of exited workers are kept so totals never
+        go backwards; their gauges are dropped.
+        """
+        snapshots = [self._snapshot()]
+        if not self.directory:
+            return snapshots
+        own = f'{os.getpid()}.json'
+        for filename in os.listdir(self.directory):
+            if not filename.endswith('.json') or filename == own:
+                continue
+            try:
+                with open(os.path.join(self.directory, filename)) as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if not _pid_alive(snapshot['pid']):
+                snapshot['gauges'] = []
+            snapshots.append(snapshot)
+        return snapshots
+
+    def _pool_gauges(self):
+        pool = current_app.extensions['sqlalchemy'].engine.pool
+        gauges = {}
+        for name, attribute in (('db_pool_checked_out', 'checkedout'),
+                                ('db_pool_overflow', 'overflow'),
+                                ('db_pool_size', 'size')):
+            if hasattr(pool, attribute):
+                gauges[(name, ())] = max(getattr(pool, attribute)(), 0)
+        return gauges
+
+    def _storage_gauges(self):
+        gauges = {}
+        engine = current_app.extensions['sqlalchemy'].engine
+        sqlite = engine.url.get_backend_name() == 'sqlite'
+        path = engine.url.database
+        if sqlite and path and path != ':memory:':
+            for name, suffix in (('sqlite_database_bytes', ''), ('sqlite_wal_bytes', '-wal')):
+                try:
+                    gauges[(name, ())] = os.path.getsize(path + suffix)
+                except OSError:
+                    gauges[(name, ())] = 0
+
+        with engine.connect() as conn:
+            if sqlite:
+                gauges.update(self._row_estimates(conn))
+            low_stock = conn.execute(
+                text('SELECT COUNT(*) FROM inventory WHERE below_threshold IS 1')
+            ).scalar()
+        gauges[('inventory_low_stock_items', ())] = low_stock
+        return gauges
+
+    def _row_estimates(self, conn):
+        """Row counts from sqlite_stat1, refreshed by ANALYZE (init-db, database optimize)"""
+        statement = text('SELECT tbl, stat FROM sqlite_stat1 WHERE tbl IN :tables').bindparams(
+            bindparam('tables', expanding=True)
+        )
+        try:
+            rows = conn.execute(statement, {'tables': ROW_COUNT_TABLES}).all()
+        except OperationalError:  # never analyzed
+            return {}
+        # Every row of a table starts with the table's row count
+        return {('table_rows', (('table', table),)): int(stat.split()[0]) for table, stat in rows}
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = []
+    for key, value in labels:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        escaped.append(f'{key}="{value}"')
+    return '{' + ','.join(escaped) + '}'
+
+
+def _format_value(value):
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+metrics = Metrics()
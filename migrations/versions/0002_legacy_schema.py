@@ -0,0 +1,111 @@
+"""legacy schema
+
+Databases created by db.create_all() before migrations existed are stamped
+at 0001, but the models that built them differ from it: some of 0001's
+indexes are missing and comment has single-column ones 0001 leaves out,
+user.password_hash is VARCHAR(120), inventory.quantity, inventory.cost and
+request_item.cost are NOT NULL, inventory still has the unmapped image_url
+column, and the event table may not exist yet. This brings such a database
+to exactly 0001, apart from the request notes columns 0003 keeps. On a
+database 0001 created there is nothing to do.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 00:19:54.310557
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+# Every index 0001 creates: name -> (table, columns, unique)
+BASELINE_INDEXES = {
+    'ix_event_created_at': ('event', ['created_at'], False),
+    'idx_inventory_category_quantity': ('inventory', ['category', 'quantity'], False),
+    'idx_inventory_cost_quantity': ('inventory', ['cost', 'quantity'], False),
+    'ix_inventory_category': ('inventory', ['category'], False),
+    'ix_inventory_cost': ('inventory', ['cost'], False),
+    'ix_inventory_created_at': ('inventory', ['created_at'], False),
+    'ix_inventory_name': ('inventory', ['name'], False),
+    'ix_inventory_quantity': ('inventory', ['quantity'], False),
+    'ix_inventory_updated_at': ('inventory', ['updated_at'], False),
+    'ix_user_created_at': ('user', ['created_at'], False),
+    'ix_user_email': ('user', ['email'], True),
+    'ix_user_is_active': ('user', ['is_active'], False),
+    'ix_user_role': ('user', ['role'], False),
+    'ix_user_school': ('user', ['school'], False),
+    'ix_user_username': ('user', ['username'], True),
+    'idx_request_created_status': ('request', ['created_at', 'status'], False),
+    'idx_request_user_status': ('request', ['user_id', 'status'], False),
+    'ix_request_created_at': ('request', ['created_at'], False),
+    'ix_request_status': ('request', ['status'], False),
+    'ix_request_total_cost': ('request', ['total_cost'], False),
+    'ix_request_updated_at': ('request', ['updated_at'], False),
+    'ix_request_user_id': ('request', ['user_id'], False),
+    'idx_requestitem_request_inventory': ('request_item', ['request_id', 'inventory_id'], False),
+    'ix_request_item_cost': ('request_item', ['cost'], False),
+    'ix_request_item_inventory_id': ('request_item', ['inventory_id'], False),
+    'ix_request_item_quantity': ('request_item', ['quantity'], False),
+    'ix_request_item_request_id': ('request_item', ['request_id'], False),
+}
+
+
+def _columns(inspector, table):
+    return {column['name']: column for column in inspector.get_columns(table)}
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if 'event' not in inspector.get_table_names():
+        op.create_table('event',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(length=40), nullable=False),
+        sa.Column('payload', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+        )
+
+    user = _columns(inspector, 'user')
+    inventory = _columns(inspector, 'inventory')
+    request_item = _columns(inspector, 'request_item')
+    widen_hash = user['password_hash']['type'].length < 255
+    relax_inventory = [name for name in ('quantity', 'cost') if not inventory[name]['nullable']]
+    drop_image_url = 'image_url' in inventory
+    relax_item_cost = not request_item['cost']['nullable']
+
+    if widen_hash:
+        with op.batch_alter_table('user', schema=None) as batch_op:
+            batch_op.alter_column('password_hash', existing_type=sa.String(length=120),
+                                  type_=sa.String(length=255), existing_nullable=False)
+    if relax_inventory or drop_image_url:
+        with op.batch_alter_table('inventory', schema=None) as batch_op:
+            for name in relax_inventory:
+                batch_op.alter_column(name, existing_type=inventory[name]['type'], nullable=True)
+            if drop_image_url:
+                batch_op.drop_column('image_url')
+    if relax_item_cost:
+        with op.batch_alter_table('request_item', schema=None) as batch_op:
+            batch_op.alter_column('cost', existing_type=sa.Float(), nullable=True)
+
+    # Match 0001's index set exactly
+    inspector = sa.inspect(bind)
+    for table in ('event', 'inventory', 'user', 'request', 'comment', 'request_item'):
+        for index in inspector.get_indexes(table):
+            if index['name'] not in BASELINE_INDEXES:
+                op.drop_index(index['name'], table_name=table)
+        existing = {index['name'] for index in inspector.get_indexes(table)}
+        for name, (indexed_table, columns, unique) in BASELINE_INDEXES.items():
+            if indexed_table == table and name not in existing:
+                op.create_index(name, table, columns, unique=unique)
+
+
+def downgrade():
+    # The legacy shape isn't worth restoring; 0001's downgrade drops it all
+    pass
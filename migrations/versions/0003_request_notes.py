@@ -0,0 +1,34 @@
+"""request notes
+
+The requester's notes and the admin's decision notes, which the request
+pages, the approval view and the exports read. Databases created before
+migrations already have both columns; only the missing ones are added.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 00:21:07.482913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    existing = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('request')}
+    with op.batch_alter_table('request', schema=None) as batch_op:
+        for name in ('notes', 'admin_notes'):
+            if name not in existing:
+                batch_op.add_column(sa.Column(name, sa.Text(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('request', schema=None) as batch_op:
+        batch_op.drop_column('admin_notes')
+        batch_op.drop_column('notes')
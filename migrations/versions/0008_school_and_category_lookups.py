@@ -0,0 +1,226 @@
+"""school and category lookups
+
+Users and inventory items reference School and Category rows by integer
+id instead of carrying free-text names. Names that differ only in case or
+whitespace are merged into one row spelt the way most rows spell it;
+duplicate schools created by 0007 are folded together and their requests
+repointed. category_threshold and category_stock are rebuilt keyed by
+category id (category_stock uses 0 for uncategorized items), keeping the
+highest threshold where merged categories disagreed.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 00:50:54.005016
+
+"""
+from collections import Counter, defaultdict
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def _key(name):
+    return ' '.join(name.split()).lower()
+
+
+def _canonical(names):
+    """Group (name, row count) pairs by normalised name.
+
+    Returns {key: (spelling, raw names)}; the spelling most rows use wins,
+    alphabetically first on a tie.
+    """
+    spellings = defaultdict(Counter)
+    raw = defaultdict(set)
+    for name, count in names:
+        if name and name.strip():
+            key = _key(name)
+            spellings[key][' '.join(name.split())] += count
+            raw[key].add(name)
+    return {
+        key: (min(counter, key=lambda spelling: (-counter[spelling], spelling)), sorted(raw[key]))
+        for key, counter in spellings.items()
+    }
+
+
+def _insert_name(bind, table, name):
+    bind.execute(sa.text(f'INSERT INTO {table} (name) VALUES (:name)'), {'name': name})
+    return bind.execute(sa.text(f'SELECT id FROM {table} WHERE name = :name'), {'name': name}).scalar()
+
+
+def _add_reference(table, column, target):
+    # SQLite takes a REFERENCES clause in ADD COLUMN but cannot add the
+    # constraint afterwards, and a batch rebuild of user or inventory would
+    # trip the foreign keys that point at them.
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute(f'ALTER TABLE "{table}" ADD COLUMN {column} INTEGER REFERENCES {target} (id)')
+    else:
+        op.add_column(table, sa.Column(column, sa.Integer(), nullable=True))
+        op.create_foreign_key(f'fk_{table}_{column}', table, target, [column], ['id'])
+
+
+def _drop_reference(table, column):
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite':
+        op.drop_constraint(f'fk_{table}_{column}', table, type_='foreignkey')
+        op.drop_column(table, column)
+    elif any('computed' in info for info in sa.inspect(bind).get_columns(table)):
+        # Batch mode can't copy a generated column (inventory.stock_value), so
+        # such a table is never rebuilt and the reference is still the
+        # column's own REFERENCES clause, which DROP COLUMN takes with it.
+        op.drop_column(table, column)
+    else:
+        # A rebuilt table carries the reference as a table constraint, and
+        # SQLite won't drop a column one names; rebuild the table without it.
+        with op.batch_alter_table(table, recreate='always') as batch_op:
+            batch_op.drop_column(column)
+
+
+def _assign(table, column, source, groups, ids):
+    bind = op.get_bind()
+    statement = sa.text(
+        f'UPDATE "{table}" SET {column} = :id WHERE {source} IN :names'
+    ).bindparams(sa.bindparam('names', expanding=True))
+    for key, (_, names) in groups.items():
+        bind.execute(statement, {'id': ids[key], 'names': names})
+
+
+def _merge_schools(bind):
+    """Fold schools whose names differ only in case or spacing; return (groups, ids)"""
+    user_names = bind.execute(sa.text(
+        'SELECT school, COUNT(*) FROM "user" GROUP BY school'
+    )).all()
+    schools = bind.execute(sa.text('SELECT id, name FROM school ORDER BY id')).all()
+    groups = _canonical(list(user_names) + [(name, 0) for _, name in schools])
+
+    ids = {}
+    by_key = defaultdict(list)
+    for school_id, name in schools:
+        by_key[_key(name)].append(school_id)
+    for key, (spelling, _) in groups.items():
+        keep, *merged = by_key.get(key) or [None]
+        if keep is None:
+            keep = _insert_name(bind, 'school', spelling)
+        for school_id in merged:
+            bind.execute(sa.text('UPDATE request SET school_id = :keep WHERE school_id = :old'),
+                         {'keep': keep, 'old': school_id})
+            bind.execute(sa.text('DELETE FROM school WHERE id = :old'), {'old': school_id})
+        bind.execute(sa.text('UPDATE school SET name = :name WHERE id = :id'), {'name': spelling, 'id': keep})
+        ids[key] = keep
+    return groups, ids
+
+
+def upgrade():
+    bind = op.get_bind()
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table('category',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    _add_reference('user', 'school_id', 'school')
+    _add_reference('inventory', 'category_id', 'category')
+    # ### end Alembic commands ###
+
+    # Schools: merge near-duplicates, then point users at them
+    school_groups, school_ids = _merge_schools(bind)
+    _assign('user', 'school_id', 'school', school_groups, school_ids)
+
+    # Categories: one row per spelling group, then point items at them
+    thresholds = bind.execute(sa.text('SELECT category, threshold FROM category_threshold')).all()
+    category_groups = _canonical(
+        list(bind.execute(sa.text('SELECT category, COUNT(*) FROM inventory GROUP BY category')).all())
+        + [(name, 0) for name, _ in thresholds]
+    )
+    category_ids = {
+        key: _insert_name(bind, 'category', spelling)
+        for key, (spelling, _) in sorted(category_groups.items(), key=lambda group: group[1][0])
+    }
+    _assign('inventory', 'category_id', 'category', category_groups, category_ids)
+
+    merged_thresholds = {}
+    for name, threshold in thresholds:
+        if name and name.strip():
+            category_id = category_ids[_key(name)]
+            merged_thresholds[category_id] = max(threshold, merged_thresholds.get(category_id, threshold))
+
+    # Rebuild the category tables keyed by id
+    op.drop_table('category_threshold')
+    category_threshold = op.create_table('category_threshold',
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('threshold', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['category_id'], ['category.id'], ),
+    sa.PrimaryKeyConstraint('category_id')
+    )
+    if merged_thresholds:
+        op.bulk_insert(category_threshold, [
+            {'category_id': category_id, 'threshold': threshold}
+            for category_id, threshold in merged_thresholds.items()
+        ])
+    op.drop_table('category_stock')
+    op.create_table('category_stock',
+    sa.Column('category_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('item_count', sa.Integer(), nullable=False),
+    sa.Column('total_quantity', sa.Integer(), nullable=False),
+    sa.Column('total_value', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('category_id')
+    )
+    op.execute(
+        "INSERT INTO category_stock (category_id, item_count, total_quantity, total_value) "
+        "SELECT COALESCE(category_id, 0), COUNT(id), COALESCE(SUM(quantity), 0), COALESCE(SUM(stock_value), 0) "
+        "FROM inventory GROUP BY COALESCE(category_id, 0)"
+    )
+
+    # Drop the free-text columns
+    op.drop_index('idx_inventory_category_quantity', table_name='inventory')
+    op.drop_column('inventory', 'category')
+    op.create_index('idx_inventory_category_quantity', 'inventory', ['category_id', 'quantity'], unique=False)
+    op.drop_column('user', 'school')
+    op.create_index(op.f('ix_user_school_id'), 'user', ['school_id'], unique=False)
+
+
+def downgrade():
+    op.add_column('user', sa.Column('school', sa.VARCHAR(length=100), nullable=True))
+    op.execute('UPDATE "user" SET school = (SELECT name FROM school WHERE school.id = "user".school_id)')
+    op.drop_index(op.f('ix_user_school_id'), table_name='user')
+    _drop_reference('user', 'school_id')
+
+    op.add_column('inventory', sa.Column('category', sa.VARCHAR(length=50), nullable=True))
+    op.execute('UPDATE inventory SET category = (SELECT name FROM category WHERE category.id = inventory.category_id)')
+    op.drop_index('idx_inventory_category_quantity', table_name='inventory')
+    op.create_index('idx_inventory_category_quantity', 'inventory', ['category', 'quantity'], unique=False)
+
+    op.create_table('category_threshold_old',
+    sa.Column('category', sa.VARCHAR(length=50), nullable=False),
+    sa.Column('threshold', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('category')
+    )
+    op.execute(
+        'INSERT INTO category_threshold_old (category, threshold) SELECT category.name, category_threshold.threshold '
+        'FROM category_threshold JOIN category ON category.id = category_threshold.category_id'
+    )
+    op.drop_table('category_threshold')
+    op.rename_table('category_threshold_old', 'category_threshold')
+
+    op.drop_table('category_stock')
+    op.create_table('category_stock',
+    sa.Column('category', sa.VARCHAR(length=50), nullable=False),
+    sa.Column('item_count', sa.Integer(), nullable=False),
+    sa.Column('total_quantity', sa.Integer(), nullable=False),
+    sa.Column('total_value', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('category')
+    )
+    op.execute(
+        "INSERT INTO category_stock (category, item_count, total_quantity, total_value) "
+        "SELECT COALESCE(category, ''), COUNT(id), COALESCE(SUM(quantity), 0), COALESCE(SUM(stock_value), 0) "
+        "FROM inventory GROUP BY COALESCE(category, '')"
+    )
+
+    _drop_reference('inventory', 'category_id')
+    op.drop_table('category')
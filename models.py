@@ -0,0 +1,172 @@
+"""
+Database models
+"""
+from datetime import datetime
+from flask_login import UserMixin
+from extensions import db, password_hasher
+
+
+class User(UserMixin, db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(80), unique=True, nullable=False, index=True)
+    email = db.Column(db.String(120), unique=True, nullable=False, index=True)
+    password_hash = db.Column(db.String(255), nullable=False)
+    role = db.Column(db.String(20), nullable=False, default='user')
+    school_id = db.Column(db.Integer, db.ForeignKey('school.id'), index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    is_active = db.Column(db.Boolean, default=True)
+
+    # Read-only: assign school_id (see lookups.py)
+    school = db.relationship('School', lazy='joined', viewonly=True)
+
+    def set_password(self, password):
+        self.password_hash = password_hasher.hash(password)
+
+    def check_password(self, password):
+        return password_hasher.verify(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        return password_hasher.needs_rehash(self.password_hash)
+
+
+class School(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), unique=True, nullable=False)
+
+    def __str__(self):
+        return self.name
+
+
+class Category(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(50), unique=True, nullable=False)
+
+    def __str__(self):
+        return self.name
+
+
+class Inventory(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    description = db.Column(db.Text)
+    # Old values of quantity, cost and category_id are loaded before they are
+    # overwritten so stock.py can adjust the category totals by the difference.
+    quantity = db.column_property(db.Column(db.Integer, default=0, index=True), active_history=True)
+    cost = db.column_property(db.Column(db.Float, default=0.0), active_history=True)
+    category_id = db.column_property(db.Column(db.Integer, db.ForeignKey('category.id')), active_history=True)
+    stock_value = db.Column(db.Float, db.Computed('quantity * cost', persisted=False), index=True)
+    reorder_threshold = db.Column(db.Integer)  # overrides the category threshold
+    below_threshold = db.Column(db.Boolean, nullable=False, default=False, server_default='0')  # kept by stock.py
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Read-only: assign category_id (see lookups.py)
+    category = db.relationship('Category', lazy='joined', viewonly=True)
+
+
+class CategoryThreshold(db.Model):
+    category_id = db.Column(db.Integer, db.ForeignKey('category.id'), primary_key=True)
+    threshold = db.Column(db.Integer, nullable=False)
+
+
+class CategoryStock(db.Model):
+    # Running totals per category, kept by stock.py; 0 is uncategorized
+    category_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    item_count = db.Column(db.Integer, nullable=False, default=0)
+    total_quantity = db.Column(db.Integer, nullable=False, default=0)
+    total_value = db.Column(db.Float, nullable=False, default=0.0)
+
+
+class Request(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    school_id = db.Column(db.Integer, db.ForeignKey('school.id'))  # the requester's school
+    status = db.Column(db.String(20), default='pending')
+    total_cost = db.Column(db.Float, default=0.0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    notes = db.Column(db.Text)  # from the requester
+    admin_notes = db.Column(db.Text)  # left with the approval decision
+    user = db.relationship('User', backref='requests')
+    items = db.relationship('RequestItem', backref='request', lazy=True)
+
+
+class RequestItem(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    request_id = db.Column(db.Integer, db.ForeignKey('request.id'), nullable=False)
+    inventory_id = db.Column(db.Integer, db.ForeignKey('inventory.id'), nullable=False, index=True)
+    quantity = db.Column(db.Integer, nullable=False)
+    cost = db.Column(db.Float, default=0.0)
+    inventory = db.relationship('Inventory')
+
+
+class Comment(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    request_id = db.Column(db.Integer, db.ForeignKey('request.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    comment = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    request = db.relationship('Request', backref='comments')
+    user = db.relationship('User', backref='comments')
+
+
+class Event(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(40), nullable=False)
+    payload = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+
+class Job(db.Model):
+    # Background work run by `flask jobs-worker`, see jobs.py
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(40), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, done, failed
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    params = db.Column(db.Text, nullable=False, default='{}')
+    progress = db.Column(db.Integer, nullable=False, default=0)  # percent
+    message = db.Column(db.String(255))
+    result_path = db.Column(db.String(255))  # file under JOBS_DIR to download
+    result_name = db.Column(db.String(255))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    started_at = db.Column(db.DateTime)
+    heartbeat_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+
+class ReportSnapshot(db.Model):
+    # Pre-computed report context, see snapshots.py
+    report = db.Column(db.String(40), primary_key=True)
+    school_id = db.Column(db.Integer, primary_key=True, autoincrement=False)  # 0: whole district
+    data = db.Column(db.Text, nullable=False)  # compact JSON
+    generated_at = db.Column(db.DateTime, nullable=False)
+
+
+class DataVersion(db.Model):
+    # Change counter per table, bumped on every write; keys template fragments (see rendering.py)
+    table_name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+
+class EmailSettings(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    smtp_server = db.Column(db.String(100), nullable=False)
+    smtp_port = db.Column(db.Integer, nullable=False)
+    username = db.Column(db.String(100), nullable=False)
+    password = db.Column(db.String(100), nullable=False)
+    use_tls = db.Column(db.Boolean, default=True)
+
+
+# Database Indexes
+# Chosen with `flask index-audit`: each one serves a query the app runs.
+# Single-column indexes that are a prefix of a composite are left out.
+db.Index('idx_request_user_status', Request.user_id, Request.status)
+db.Index('idx_request_status_created', Request.status, Request.created_at)
+db.Index('idx_request_school_status_created', Request.school_id, Request.status, Request.created_at)
+db.Index('idx_inventory_category_quantity', Inventory.category_id, Inventory.quantity)
+db.Index('idx_inventory_below_threshold', Inventory.quantity,
+         sqlite_where=Inventory.below_threshold.is_(True),
+         postgresql_where=Inventory.below_threshold.is_(True))
+db.Index('idx_requestitem_request_inventory', RequestItem.request_id, RequestItem.inventory_id)
+db.Index('idx_comment_request_id', Comment.request_id, Comment.id)
+db.Index('idx_job_status_id', Job.status, Job.id)
@@ -11,6 +11,9 @@ sys.path.insert(0, os.path.dirname(__file__))
 
 # Set environment variables for PythonAnywhere
 os.environ['FLASK_ENV'] = 'production'
+# No `flask jobs-worker` runs next to a PythonAnywhere web app: run exports
+# and imports in the request (see jobs.py)
+os.environ.setdefault('JOBS_INLINE', 'true')
 
 # Import and create the Flask application
 from app import create_app
@@ -0,0 +1,107 @@
+"""
+Password hashing with configurable cost and rehash-on-login support
+"""
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.security import generate_password_hash, check_password_hash, DEFAULT_PBKDF2_ITERATIONS
+
+try:
+    from argon2 import PasswordHasher as Argon2Hasher
+    from argon2.exceptions import VerificationError, InvalidHashError
+except ImportError:  # argon2-cffi is optional
+    Argon2Hasher = None
+
+SCRYPT_DEFAULTS = ('32768', '8', '1')
+
+
+def normalize_method(method):
+    """Expand a method spec to the exact prefix Werkzeug writes into the hash.
+
+    `pbkdf2` becomes `pbkdf2:sha256:600000`, `scrypt` becomes
+    `scrypt:32768:8:1`, `argon2` takes `argon2:<time>:<memory KiB>:<parallelism>`.
+    """
+    parts = method.split(':')
+    if parts[0] == 'pbkdf2':
+        hash_name = parts[1] if len(parts) > 1 else 'sha256'
+        iterations = parts[2] if len(parts) > 2 else str(DEFAULT_PBKDF2_ITERATIONS)
+        return f'pbkdf2:{hash_name}:{iterations}'
+    if parts[0] == 'scrypt':
+        return 'scrypt:' + ':'.join(parts[1:] + list(SCRYPT_DEFAULTS[len(parts) - 1:]))
+    if parts[0] == 'argon2':
+        defaults = ('3', '65536', '4')
+        return 'argon2:' + ':'.join(parts[1:] + list(defaults[len(parts) - 1:]))
+    raise ValueError(f'Unsupported password hash method: {method}')
+
+
+class PasswordHasher:
+    """Hashes and verifies passwords with the configured algorithm and cost.
+
+    Verification can run on a bounded thread pool. hashlib releases the GIL
+    while hashing, so under threaded or gevent workers the serving thread is
+    free while a login is checked, and the pool size caps how many cores
+    login bursts can occupy at once.
+    """
+
+    def __init__(self, app=None, method=None, threads=None):
+        self.method = None
+        self._argon2 = None
+        self._executor = None
+        if app is not None:
+            self.init_app(app)
+        elif method is not None:
+            self.configure(method, threads or 0)
+
+    def init_app(self, app):
+        self.configure(
+            app.config.get('PASSWORD_HASH_METHOD', 'pbkdf2'),
+            app.config.get('PASSWORD_HASH_THREADS', 0)
+        )
+
+    def configure(self, method, threads=0):
+        self.method = normalize_method(method)
+        self._argon2 = None
+        if self.method.startswith('argon2:'):
+            if Argon2Hasher is None:
+                raise RuntimeError('PASSWORD_HASH_METHOD is argon2 but argon2-cffi is not installed')
+            time_cost, memory_cost, parallelism = (int(p) for p in self.method.split(':')[1:])
+            self._argon2 = Argon2Hasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        if threads:
+            self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='password-hash')
+
+    def hash(self, password):
+        if self._argon2 is not None:
+            return self._argon2.hash(password)
+        return generate_password_hash(password, method=self.method)
+
+    def verify(self, password_hash, password):
+        if self._executor is None:
+            return self._verify(password_hash, password)
+        return self._run_offloaded(self._verify, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        if password_hash.startswith('$argon2'):
+            return self._argon2 is None or self._argon2.check_needs_rehash(password_hash)
+        return self._argon2 is not None or password_hash.split('$', 1)[0] != self.method
+
+    def _verify(self, password_hash, password):
+        if password_hash.startswith('$argon2'):
+            if Argon2Hasher is None:
+                return False
+            try:
+                return (self._argon2 or Argon2Hasher()).verify(password_hash, password)
+            except (VerificationError, InvalidHashError):
+                return False
+        return check_password_hash(password_hash, password)
+
+    def _run_offloaded(self, func, *args):
+        # Under gevent, threads are monkey-patched into greenlets; use the
+        # hub's native thread pool so the hash doesn't block the event loop.
+        try:
+            from gevent import monkey, get_hub
+            if monkey.is_module_patched('threading'):
+                return get_hub().threadpool.apply(func, args)
+        except ImportError:
+            pass
+        return self._executor.submit(func, *args).result()
@@ -0,0 +1,135 @@
+"""
+Per-request SQL instrumentation and slow-query log
+"""
+import heapq
+import logging
+import time
+from contextlib import contextmanager
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from extensions import db
+
+slow_query_logger = logging.getLogger('resource_management.slow_queries')
+
+
+class RequestQueryStats:
+    """Query count, total DB time and slowest statements of one request"""
+
+    def __init__(self, keep_slowest=5):
+        self.count = 0
+        self.total_time = 0.0
+        self.keep_slowest = keep_slowest
+        self._slowest = []
+
+    def add(self, statement, duration):
+        self.count += 1
+        self.total_time += duration
+        item = (duration, self.count, statement)
+        if len(self._slowest) < self.keep_slowest:
+            heapq.heappush(self._slowest, item)
+        elif item > self._slowest[0]:
+            heapq.heapreplace(self._slowest, item)
+
+    @property
+    def slowest(self):
+        return [(statement, duration) for duration, _, statement in sorted(self._slowest, reverse=True)]
+
+
+class QueryInstrumentation:
+    """Times every statement on the app's engine via cursor execute hooks.
+
+    Each request gets a RequestQueryStats in `g.query_stats`. Statements
+    slower than SLOW_QUERY_THRESHOLD_MS go to the slow-query log as they
+    finish, and requests issuing more than SLOW_REQUEST_QUERY_COUNT
+    statements are logged when they end, which is how N+1 loops show up.
+    With SQL_STATS_HEADERS (on in debug) the totals are returned in
+    X-Query-Count / X-Query-Time-Ms and a Server-Timing header.
+    """
+
+    def __init__(self, app=None):
+        self._listeners = []
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not app.config.get('SQL_INSTRUMENTATION', True):
+            return
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+
+        @app.before_request
+        def start_query_stats():
+            g.query_stats = RequestQueryStats(app.config['SQL_STATS_SLOWEST'])
+
+        @app.after_request
+        def report_query_stats(response):
+            stats = g.get('query_stats')
+            if stats is None:
+                return response
+            headers = app.config['SQL_STATS_HEADERS']
+            if headers if headers is not None else app.debug:
+                db_ms = stats.total_time * 1000
+                response.headers['X-Query-Count'] = str(stats.count)
+                response.headers['X-Query-Time-Ms'] = f'{db_ms:.1f}'
+                response.headers.add('Server-Timing', f'db;dur={db_ms:.1f};desc="{stats.count} queries"')
+            if stats.count > app.config['SLOW_REQUEST_QUERY_COUNT']:
+                slow_query_logger.warning(
+                    '%s %s issued %d queries in %.1f ms; slowest: %s',
+                    request.method, request.path, stats.count, stats.total_time * 1000,
+                    ' | '.join(f'{duration * 1000:.1f} ms {_shorten(statement)}'
+                               for statement, duration in stats.slowest)
+                )
+            return response
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - conn.info['query_start_time'].pop()
+        for listener in self._listeners:
+            listener(statement, duration)
+        if not has_request_context():
+            return
+        stats = g.get('query_stats')
+        if stats is not None:
+            stats.add(statement, duration)
+        threshold = current_app.config['SLOW_QUERY_THRESHOLD_MS']
+        if threshold is not None and duration * 1000 >= threshold:
+            slow_query_logger.warning(
+                '%.1f ms %s %s: %s', duration * 1000, request.method, request.path, _shorten(statement)
+            )
+
+    @contextmanager
+    def capture(self):
+        """Collect (statement, seconds) for every query run inside the block"""
+        captured = []
+        listener = lambda statement, duration: captured.append((statement, duration))
+        self._listeners.append(listener)
+        try:
+            yield captured
+        finally:
+            self._listeners.remove(listener)
+
+    @contextmanager
+    def assert_max_queries(self, max_queries):
+        """Fail with the captured statements if the block runs too many queries.
+
+        Usage in tests:
+            with query_stats.assert_max_queries(5):
+                client.get('/admin/requests')
+        """
+        with self.capture() as captured:
+            yield captured
+        if len(captured) > max_queries:
+            listing = '\n'.join(f'  {duration * 1000:.1f} ms {_shorten(statement)}' for statement, duration in captured)
+            raise AssertionError(f'{len(captured)} queries executed, expected at most {max_queries}:\n{listing}')
+
+
+def _shorten(statement, limit=300):
+    statement = ' '.join(statement.split())
+    return statement if len(statement) <= limit else statement[:limit] + '...'
+
+
+query_stats = QueryInstrumentation()
@@ -0,0 +1,164 @@
+"""
+Readiness checks run in the background so probes never wait on the database
+"""
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+from extensions import db, mail
+from jobs import job_queue
+
+OK, DEGRADED, FAILING = 'ok', 'degraded', 'failing'
+SEVERITY = {OK: 0, DEGRADED: 1, FAILING: 2}
+
+
+class ReadinessMonitor:
+    """Runs the readiness checks every READINESS_CHECK_INTERVAL seconds.
+
+    /readyz only reads the last result, so a probe is constant-time. A slow
+    database is reported as degraded instead of timing the probe out, and a
+    result older than READINESS_STALE_AFTER (checker thread stuck) fails.
+    The thread is started on the first probe, i.e. after gunicorn forks.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._result = None
+        self._thread = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+
+    def status(self):
+        """Return (http_status, payload) from the cached check result"""
+        self._ensure_started()
+        result = self._result
+        age = time.monotonic() - result['checked_at']
+        payload = {
+            'status': result['status'],
+            'checked_at': result['timestamp'],
+            'age_seconds': round(age, 1),
+            'checks': result['checks'],
+        }
+        if age > self.app.config['READINESS_STALE_AFTER']:
+            payload['status'] = FAILING
+            payload['error'] = 'readiness checks are not running'
+        return (503 if payload['status'] == FAILING else 200), payload
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            if self._result is None:
+                self.run_checks()
+            self._thread = threading.Thread(target=self._run, name='readiness-checks', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        interval = self.app.config['READINESS_CHECK_INTERVAL']
+        while True:
+            time.sleep(interval)
+            try:
+                self.run_checks()
+            except Exception as e:
+                self.app.logger.error(f'Readiness checks failed to run: {e}')
+
+    def run_checks(self):
+        with self.app.app_context():
+            checks = {
+                'database': self._check_database(),
+                'wal': self._check_wal(),
+                'disk': self._check_disk(),
+                'jobs_worker': self._check_jobs_worker(),
+                'mail_backlog': self._check_mail_backlog(),
+            }
+        status = max((check['status'] for check in checks.values()), key=SEVERITY.get)
+        self._result = {
+            'status': status,
+            'checks': checks,
+            'checked_at': time.monotonic(),
+            'timestamp': datetime.utcnow().isoformat(),
+        }
+        return self._result
+
+    def _check_database(self):
+        """Time how long it takes to get SQLite's write lock"""
+        config = self.app.config
+        started = time.perf_counter()
+        try:
+            connection = db.engine.raw_connection()
+            try:
+                cursor = connection.cursor()
+                if db.engine.url.get_backend_name() == 'sqlite':
+                    cursor.execute('BEGIN IMMEDIATE')
+                    connection.rollback()
+                else:
+                    cursor.execute('SELECT 1')
+                cursor.close()
+            finally:
+                connection.close()
+        except Exception as e:
+            return {'status': FAILING, 'error': str(e)}
+        latency_ms = (time.perf_counter() - started) * 1000
+        status = DEGRADED if latency_ms > config['READINESS_DB_LATENCY_MS'] else OK
+        return {'status': status, 'write_lock_ms': round(latency_ms, 1)}
+
+    def _check_wal(self):
+        path = self._database_path()
+        if path is None:
+            return {'status': OK, 'skipped': 'not a SQLite file database'}
+        try:
+            wal_bytes = os.path.getsize(path + '-wal')
+        except OSError:
+            wal_bytes = 0
+        status = DEGRADED if wal_bytes > self.app.config['READINESS_WAL_MAX_BYTES'] else OK
+        return {'status': status, 'wal_bytes': wal_bytes}
+
+    def _check_disk(self):
+        path = self._database_path()
+        directory = os.path.dirname(path) if path else self.app.instance_path
+        try:
+            free_bytes = shutil.disk_usage(directory).free
+        except OSError as e:
+            return {'status': FAILING, 'error': str(e)}
+        config = self.app.config
+        if free_bytes < config['READINESS_DISK_FREE_MIN_BYTES']:
+            status = FAILING
+        elif free_bytes < config['READINESS_DISK_FREE_WARN_BYTES']:
+            status = DEGRADED
+        else:
+            status = OK
+        return {'status': status, 'free_bytes': free_bytes}
+
+    def _check_jobs_worker(self):
+        """Queued exports and imports only run while a `flask jobs-worker` is up"""
+        if job_queue.inline:
+            return {'status': OK, 'skipped': 'jobs run inside the request (JOBS_INLINE)'}
+        age = job_queue.worker_age()
+        if age is None or age > self.app.config['JOB_STALE_AFTER'].total_seconds():
+            return {'status': FAILING, 'error': 'no jobs worker is running; start `flask jobs-worker` '
+                                                'or set JOBS_INLINE'}
+        return {'status': OK, 'heartbeat_age_seconds': round(age, 1)}
+
+    def _check_mail_backlog(self):
+        """Notification emails waiting on the send_later threads of this worker"""
+        queued, oldest_age = mail.backlog()
+        config = self.app.config
+        too_old = oldest_age > config['READINESS_MAIL_BACKLOG_AGE']
+        status = DEGRADED if queued > config['READINESS_MAIL_BACKLOG_MAX'] or too_old else OK
+        return {'status': status, 'queued': queued, 'oldest_seconds': round(oldest_age, 1)}
+
+    def _database_path(self):
+        url = db.engine.url
+        if url.get_backend_name() != 'sqlite' or not url.database or url.database == ':memory:':
+            return None
+        return os.path.abspath(url.database)
+
+
+readiness = ReadinessMonitor()
@@ -0,0 +1,167 @@
+"""
+Template rendering: timing, bytecode cache and fragment cache
+
+Every render_template call is timed into the template_render_duration_seconds
+histogram, labelled by template. With JINJA_BYTECODE_CACHE_DIR set, compiled
+templates are kept on disk, so a new worker loads them instead of compiling
+every template again.
+
+Expensive sections of a page are wrapped in a fragment cache tag:
+
+    {% cache 'overview', data_version('request', 'inventory') %}
+        {% set stats = overview() %} ... {% endcache %}
+
+The rendered HTML is kept per process for FRAGMENT_CACHE_TTL seconds,
+keyed on the template, the tag's arguments and the school scope. Views
+pass loader functions rather than results, so a hit skips the queries as
+well as the rendering. data_version() returns the change counters of
+the named tables. Every ORM flush or bulk statement that changes a row
+of a versioned table bumps its counter in the data_version table in the
+same transaction, so a write in any worker retires the fragments built
+from the old data. A flush that only touches bookkeeping tables (jobs,
+events, snapshots) issues no UPDATE. A new data table gets its row in the
+migration that creates it and its name in VERSIONED_TABLES.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from itertools import chain
+from flask import g, before_render_template, template_rendered
+from jinja2 import FileSystemBytecodeCache, nodes
+from jinja2.ext import Extension
+from sqlalchemy import event, select, update
+from extensions import db
+from metrics import metrics
+from models import DataVersion
+from scoping import school_scope
+
+# Tables with a data_version row
+VERSIONED_TABLES = frozenset({
+    'user', 'school', 'category', 'inventory', 'category_threshold', 'category_stock',
+    'request', 'request_item', 'comment', 'email_settings',
+})
+
+
+class FragmentCacheExtension(Extension):
+    """{% cache name, key... %}body{% endcache %}"""
+
+    tags = {'cache'}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            args.append(parser.parse_expression())
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        call = self.call_method('_cache', [nodes.Const(parser.name), nodes.List(args)])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _cache(self, template, args, caller):
+        return self.environment.fragment_cache.fetch(template, args, caller)
+
+
+class Rendering:
+    def __init__(self, app=None):
+        self.ttl = 300
+        self.max_size = 0
+        self._lock = threading.Lock()
+        self._fragments = OrderedDict()
+        self._size = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.ttl = app.config['FRAGMENT_CACHE_TTL']
+        self.max_size = app.config['FRAGMENT_CACHE_MAX_SIZE']
+        directory = app.config['JINJA_BYTECODE_CACHE_DIR']
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            app.jinja_env.bytecode_cache = FileSystemBytecodeCache(directory)
+        app.jinja_env.add_extension(FragmentCacheExtension)
+        app.jinja_env.fragment_cache = self
+        app.add_template_global(self.data_version, 'data_version')
+
+        before_render_template.connect(self._render_started, app, weak=False)
+        template_rendered.connect(self._render_finished, app, weak=False)
+
+        for name, listener in (('before_flush', self._collect_changes),
+                               ('after_flush', self._bump_flushed),
+                               ('do_orm_execute', self._bump_statement)):
+            if not event.contains(db.session, name, listener):
+                event.listen(db.session, name, listener)
+
+    def data_version(self, *tables):
+        """Change counters of the named tables, read once per request"""
+        if 'data_versions' not in g:
+            # Unscoped: resolving the school scope would load current_user,
+            # whose loader reads the user version
+            g.data_versions = dict(db.session.execute(
+                select(DataVersion.table_name, DataVersion.version).execution_options(unscoped=True)
+            ).all())
+        return tuple(g.data_versions.get(table, 0) for table in tables)
+
+    def fetch(self, template, args, caller):
+        """Cached HTML of a fragment, rendering it with caller() on a miss"""
+        key = (template, *args, school_scope.current())
+        now = time.monotonic()
+        with self._lock:
+            entry = self._fragments.get(key)
+            if entry is not None and entry[0] > now:
+                self._fragments.move_to_end(key)
+                metrics.inc('template_fragment_cache_total', fragment=f'{template}:{args[0]}', result='hit')
+                return entry[1]
+        metrics.inc('template_fragment_cache_total', fragment=f'{template}:{args[0]}', result='miss')
+        html = caller()
+        # A fragment bigger than a quarter of the cache would evict everything else
+        if self.ttl and len(html) <= self.max_size // 4:
+            with self._lock:
+                previous = self._fragments.pop(key, None)
+                if previous is not None:
+                    self._size -= len(previous[1])
+                self._fragments[key] = (now + self.ttl, html)
+                self._size += len(html)
+                while self._size > self.max_size:
+                    _, (_, evicted) = self._fragments.popitem(last=False)
+                    self._size -= len(evicted)
+        return html
+
+    def _render_started(self, app, template, context, **extra):
+        g.setdefault('render_started', []).append(time.perf_counter())
+
+    def _render_finished(self, app, template, context, **extra):
+        started = g.get('render_started')
+        if started:
+            metrics.observe_render(time.perf_counter() - started.pop(), template.name)
+
+    def _collect_changes(self, session, flush_context, instances):
+        changed = session.info.setdefault('changed_tables', set())
+        # session.dirty also holds objects whose attributes were set to the
+        # values they already had, or only had a collection appended to
+        dirty = (instance for instance in session.dirty
+                 if session.is_modified(instance, include_collections=False))
+        for instance in chain(session.new, dirty, session.deleted):
+            changed.add(instance.__table__.name)
+
+    def _bump_flushed(self, session, flush_context):
+        changed = session.info.pop('changed_tables', None)
+        if changed:
+            self._bump(session.connection(), changed)
+
+    def _bump_statement(self, state):
+        # Bulk UPDATE/DELETE/INSERT statements skip the flush
+        if state.is_update or state.is_delete or state.is_insert:
+            self._bump(state.session.connection(), {state.statement.table.name})
+
+    def _bump(self, connection, tables):
+        tables = VERSIONED_TABLES.intersection(tables)
+        if not tables:
+            return
+        connection.execute(
+            update(DataVersion.__table__)
+            .where(DataVersion.__table__.c.table_name.in_(sorted(tables)))
+            .values(version=DataVersion.__table__.c.version + 1)
+        )
+
+
+rendering = Rendering()
@@ -0,0 +1,67 @@
+"""
+Read-only rows for report tables and exports
+
+Report pages and exports read a handful of columns from many rows and
+never change them. Loading them as ORM objects costs an identity-map
+entry, instance state and an attribute dict per row, hydrates columns
+nobody shows (Inventory.description), and lazy-loads the requester of
+every request one query at a time. The selects here name just the
+columns a table shows, join the user, school and category names in, and
+come back as SQLAlchemy Row tuples: attribute access like the models
+(row.username, row.total_cost), nothing added to the session. They are
+still ORM selects, so school scoping applies as usual.
+"""
+from sqlalchemy import select
+from extensions import db
+from models import User, School, Category, Inventory, Request, RequestItem
+
+EXPORT_BATCH_SIZE = 2000
+
+
+def request_rows(*columns):
+    """Requests with the requester's username; pass extra columns to add them"""
+    return select(
+        Request.id, User.username, Request.status, Request.total_cost,
+        Request.created_at, Request.updated_at, *columns
+    ).join(User, User.id == Request.user_id)
+
+
+def inventory_rows(*columns):
+    """Inventory items with their category name; pass extra columns to add them"""
+    return select(
+        Inventory.id, Inventory.name, Category.name.label('category'), Inventory.quantity,
+        Inventory.cost, Inventory.stock_value, Inventory.updated_at, *columns
+    ).outerjoin(Category, Category.id == Inventory.category_id)
+
+
+def request_item_rows(*criteria):
+    """Request lines with the requester's username and the item name"""
+    return select(
+        RequestItem.id, RequestItem.request_id, User.username, Inventory.name.label('item_name'),
+        RequestItem.quantity, RequestItem.cost
+    ).join(Request, Request.id == RequestItem.request_id).join(
+        User, User.id == Request.user_id
+    ).join(Inventory, Inventory.id == RequestItem.inventory_id).where(*criteria)
+
+
+def user_rows(*criteria):
+    """Users with their school name"""
+    return select(
+        User.id, User.username, User.email, User.role, School.name.label('school'),
+        User.created_at, User.is_active
+    ).outerjoin(School, School.id == User.school_id).where(*criteria)
+
+
+def fetch(statement):
+    """All rows of a select from this module"""
+    return db.session.execute(statement).all()
+
+
+def stream(statement, batch_size=EXPORT_BATCH_SIZE):
+    """Rows of a select from this module, fetched batch_size at a time.
+
+    For exports: only one batch of rows is held in memory at once.
+    """
+    result = db.session.execute(statement.execution_options(yield_per=batch_size))
+    for partition in result.partitions():
+        yield from partition
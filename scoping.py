@@ -0,0 +1,76 @@
+"""
+School scoping: admins and school managers only see their own school's requests
+
+The scope is resolved from current_user on the first query of each HTTP
+request and added to every ORM SELECT with with_loader_criteria, so views
+and reports don't filter by hand and per-school pages use the
+(school_id, status, created_at) index. Super admins, and admins without a
+school, see the whole district. Pass execution_options(unscoped=True) to
+read across schools on purpose. Background jobs have no current_user; they
+call use() with the scope captured when they were queued.
+"""
+from flask import g, has_request_context
+from flask_login import current_user
+from sqlalchemy import event, select
+from sqlalchemy.orm import with_loader_criteria
+from extensions import db
+from models import User, Request, RequestItem
+
+SCOPED_ROLES = ('admin', 'school_manager')
+
+
+class SchoolScope:
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not event.contains(db.session, 'do_orm_execute', self._apply):
+            event.listen(db.session, 'do_orm_execute', self._apply)
+
+    def current(self):
+        """School id the current user (or job) is limited to, or None for no limit"""
+        if 'school_scope' not in g:
+            if not has_request_context():
+                return None
+            # Set first: loading current_user runs queries that come back here
+            g.school_scope = None
+            g.school_scope = self._resolve()
+        return g.school_scope
+
+    def use(self, school_id):
+        """Limit the rest of this app context to a school, e.g. in a background job"""
+        g.school_scope = school_id
+
+    def user_criteria(self):
+        """Filters for user listings. Users are not scoped automatically:
+        logins and comment authors must resolve across schools."""
+        school_id = self.current()
+        if school_id is None:
+            return []
+        return [User.school_id == school_id]
+
+    def _resolve(self):
+        if not current_user.is_authenticated or current_user.role not in SCOPED_ROLES:
+            return None
+        return current_user.school_id
+
+    def _apply(self, state):
+        if not state.is_select or state.execution_options.get('unscoped'):
+            return
+        school_id = self.current()
+        if school_id is None:
+            return
+        requests = Request.__table__
+        state.statement = state.statement.options(
+            with_loader_criteria(Request, Request.school_id == school_id, include_aliases=True),
+            with_loader_criteria(
+                RequestItem,
+                # Core columns, so the Request criteria aren't applied a second time
+                RequestItem.request_id.in_(select(requests.c.id).where(requests.c.school_id == school_id)),
+                include_aliases=True
+            )
+        )
+
+
+school_scope = SchoolScope()
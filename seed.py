@@ -0,0 +1,181 @@
+"""
+Deterministic synthetic dataset for local profiling, tests and benchmarks
+
+Rows are built in Python from a seeded random.Random and written with Core
+executemany inserts in batches, bypassing the ORM unit of work, so a
+million requests take minutes rather than hours. The same seed and `until`
+date always produce the same rows.
+"""
+import bisect
+import itertools
+import random
+from datetime import datetime, timedelta
+from sqlalchemy import func, select
+from extensions import db, password_hasher
+from models import User, School, Category, Inventory, Request, RequestItem, Comment
+from stock import stock_monitor
+
+CATALOGUE = {
+    'Stationery': ['Pen', 'Pencil', 'Notebook', 'Marker', 'Stapler', 'Paper Ream', 'Folder'],
+    'Electronics': ['Projector', 'Calculator', 'HDMI Cable', 'Tablet', 'Speaker', 'Printer Toner'],
+    'Furniture': ['Chair', 'Desk', 'Whiteboard', 'Bookshelf', 'Filing Cabinet'],
+    'Cleaning': ['Mop', 'Disinfectant', 'Paper Towels', 'Bin Liners', 'Hand Soap'],
+    'Sports': ['Football', 'Basketball', 'Cones', 'Skipping Rope', 'Stopwatch'],
+    'Science': ['Beaker', 'Test Tubes', 'Microscope Slides', 'Safety Goggles', 'Bunsen Burner'],
+    'Art': ['Paint Set', 'Brushes', 'Sketchbook', 'Clay', 'Colored Pencils'],
+    'Books': ['Textbook', 'Workbook', 'Dictionary', 'Atlas', 'Reader'],
+}
+
+# Status mix by request age; old requests have mostly been worked through
+STATUS_BY_AGE = [
+    (2, [('pending', 60), ('pending_manager_approval', 20), ('approved', 15), ('rejected', 5)]),
+    (14, [('pending', 20), ('pending_manager_approval', 10), ('approved', 40), ('delivered', 20), ('rejected', 10)]),
+    (None, [('pending', 3), ('approved', 12), ('delivered', 75), ('rejected', 10)]),
+]
+USER_COMMENTS = [
+    'Needed for next week, please.',
+    'Can we get this sooner?',
+    'Any update on this request?',
+    'Quantity can be reduced if stock is low.',
+    'Thanks!',
+]
+
+
+def _cumulative(weights):
+    return list(itertools.accumulate(weights))
+
+
+def _weighted(rng, values, cumulative):
+    return values[bisect.bisect_right(cumulative, rng.random() * cumulative[-1])]
+
+
+def generate_dataset(schools=10, users_per_school=20, items=500, requests=20000,
+                     comments_per_request=0.3, days=365, password='password',
+                     seed=42, until=None, batch_size=10000):
+    """Insert a synthetic dataset into the current app's database.
+
+    Every school gets an admin (`admin_s<n>`), a school manager
+    (`manager_s<n>`) and `users_per_school` users (`user_s<n>_<i>`), all
+    with `password`. Items are picked with a Zipf-like popularity so a few
+    items dominate, request statuses depend on their age, and every status
+    change leaves an admin comment, followed by occasional user comments.
+    Returns the number of rows written per table.
+    """
+    rng = random.Random(seed)
+    until = until or datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    password_hash = password_hasher.hash(password)
+    counts = {'school': 0, 'user': 0, 'category': 0, 'inventory': 0, 'request': 0, 'request_item': 0, 'comment': 0}
+
+    with db.engine.begin() as conn:
+        # Schools and users
+        school_rows = [{'name': f'School {school}'} for school in range(1, schools + 1)]
+        conn.execute(School.__table__.insert(), school_rows)
+        counts['school'] = len(school_rows)
+        school_ids = dict(conn.execute(select(School.name, School.id)).all())
+
+        user_rows = []
+        for school in range(1, schools + 1):
+            accounts = [(f'admin_s{school}', 'admin'), (f'manager_s{school}', 'school_manager')]
+            accounts += [(f'user_s{school}_{i}', 'user') for i in range(1, users_per_school + 1)]
+            for username, role in accounts:
+                user_rows.append({
+                    'username': username,
+                    'email': f'{username}@example.com',
+                    'password_hash': password_hash,
+                    'role': role,
+                    'school_id': school_ids[f'School {school}'],
+                    'is_active': rng.random() > 0.02,
+                    'created_at': until - timedelta(days=days + rng.randint(0, 365)),
+                })
+        conn.execute(User.__table__.insert(), user_rows)
+        counts['user'] = len(user_rows)
+
+        users = conn.execute(select(User.id, User.role, User.school_id)).all()
+        admin_by_school = {school_id: user_id for user_id, role, school_id in users if role == 'admin'}
+        requesters = [(user_id, admin_by_school.get(school_id), school_id)
+                      for user_id, role, school_id in users if role == 'user']
+
+        # Categories (uploads may already have added some) and inventory
+        categories = list(CATALOGUE)
+        category_ids = dict(conn.execute(select(Category.name, Category.id)).all())
+        category_rows = [{'name': category} for category in categories if category not in category_ids]
+        if category_rows:
+            conn.execute(Category.__table__.insert(), category_rows)
+            category_ids = dict(conn.execute(select(Category.name, Category.id)).all())
+        counts['category'] = len(category_rows)
+
+        inventory_rows = []
+        for i in range(1, items + 1):
+            category = rng.choice(categories)
+            inventory_rows.append({
+                'name': f'{rng.choice(CATALOGUE[category])} {i}',
+                'description': f'{category} item {i}',
+                'quantity': rng.randint(0, 500),
+                'cost': round(rng.lognormvariate(3, 1.2), 2),
+                'category_id': category_ids[category],
+                'created_at': until - timedelta(days=days + rng.randint(0, 365)),
+                'updated_at': until - timedelta(days=rng.randint(0, 30)),
+            })
+        conn.execute(Inventory.__table__.insert(), inventory_rows)
+        counts['inventory'] = len(inventory_rows)
+
+        catalogue = conn.execute(select(Inventory.id, Inventory.cost)).all()
+        rng.shuffle(catalogue)
+        popularity = _cumulative([1 / rank ** 1.1 for rank in range(1, len(catalogue) + 1)])
+        status_tables = [(age, [s for s, _ in mix], _cumulative([w for _, w in mix])) for age, mix in STATUS_BY_AGE]
+
+        # Requests with their items and comment history
+        next_request_id = (conn.execute(select(func.max(Request.id))).scalar() or 0) + 1
+        request_rows, item_rows, comment_rows = [], [], []
+        for request_id in range(next_request_id, next_request_id + requests):
+            age = timedelta(seconds=rng.randint(0, days * 86400))
+            created_at = until - age
+            for max_age, statuses, cumulative in status_tables:
+                if max_age is None or age.days < max_age:
+                    status = _weighted(rng, statuses, cumulative)
+                    break
+            user_id, admin_id, school_id = rng.choice(requesters)
+
+            picked = {}
+            for _ in range(rng.choices((1, 2, 3, 4, 5), weights=(35, 30, 20, 10, 5))[0]):
+                inventory_id, cost = _weighted(rng, catalogue, popularity)
+                picked[inventory_id] = cost
+            total = 0.0
+            for inventory_id, cost in picked.items():
+                quantity = rng.randint(1, 10)
+                total += cost * quantity
+                item_rows.append({'request_id': request_id, 'inventory_id': inventory_id,
+                                  'quantity': quantity, 'cost': cost})
+
+            updated_at = created_at
+            if status != 'pending' and admin_id is not None:
+                updated_at = min(created_at + timedelta(minutes=rng.randint(10, 4 * 1440)), until)
+                comment_rows.append({'request_id': request_id, 'user_id': admin_id,
+                                     'comment': f'Status changed to {status}.', 'created_at': updated_at})
+            if rng.random() < comments_per_request:
+                comment_rows.append({'request_id': request_id, 'user_id': user_id,
+                                     'comment': rng.choice(USER_COMMENTS),
+                                     'created_at': created_at + timedelta(minutes=rng.randint(1, 600))})
+
+            request_rows.append({'id': request_id, 'user_id': user_id, 'school_id': school_id, 'status': status,
+                                 'total_cost': round(total, 2), 'created_at': created_at,
+                                 'updated_at': updated_at})
+            if len(request_rows) >= batch_size:
+                _flush(conn, counts, request_rows, item_rows, comment_rows)
+        _flush(conn, counts, request_rows, item_rows, comment_rows)
+        stock_monitor.refresh(conn)
+        stock_monitor.rebuild_totals(conn)
+
+    with db.engine.connect() as conn:
+        conn.exec_driver_sql('ANALYZE')
+    return counts
+
+
+def _flush(conn, counts, request_rows, item_rows, comment_rows):
+    for table, rows in ((Request.__table__, request_rows),
+                        (RequestItem.__table__, item_rows),
+                        (Comment.__table__, comment_rows)):
+        if rows:
+            conn.execute(table.insert(), rows)
+            counts[table.name] += len(rows)
+            rows.clear()
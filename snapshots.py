@@ -0,0 +1,107 @@
+"""
+Report snapshots: pre-computed data for the heavy management reports
+
+A report registers a builder with @report_snapshots.report(name) that
+returns its template context. The context is stored as compact JSON in
+ReportSnapshot, one row per report and school scope, and the report page
+renders the latest row instead of recomputing it. `flask report-snapshots`
+(run from cron before people arrive) rebuilds the REPORT_SNAPSHOTS reports
+for the whole district and for every school that has scoped staff; a page
+whose snapshot is missing or older than REPORT_SNAPSHOT_MAX_AGE rebuilds
+it on open, and the page's refresh button rebuilds it on demand.
+"""
+import json
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+from flask import g
+from sqlalchemy import select
+from extensions import db
+from models import User, ReportSnapshot
+from scoping import school_scope, SCOPED_ROLES
+
+DISTRICT = 0  # ReportSnapshot.school_id of unscoped snapshots
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return {'$datetime': value.isoformat()}
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, SimpleNamespace):
+        return vars(value)
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def _decode(obj):
+    # Rows come back with attribute access, as the templates expect
+    if len(obj) == 1 and '$datetime' in obj:
+        return datetime.fromisoformat(obj['$datetime'])
+    return SimpleNamespace(**obj)
+
+
+class ReportSnapshots:
+    def __init__(self, app=None):
+        self.scheduled = ()
+        self.max_age = None
+        self._builders = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.scheduled = tuple(app.config['REPORT_SNAPSHOTS'])
+        self.max_age = app.config['REPORT_SNAPSHOT_MAX_AGE']
+
+    def report(self, name):
+        """Register the builder of a report's template context.
+
+        The builder returns a dict of JSON-friendly values: numbers,
+        strings, datetimes and lists of dicts or SimpleNamespaces (convert
+        query rows with row._asdict()).
+        """
+        def register(builder):
+            self._builders[name] = builder
+            return builder
+        return register
+
+    def __contains__(self, name):
+        return name in self._builders
+
+    def latest(self, name, refresh=False):
+        """(context, generated_at) of a report for the current school scope"""
+        snapshot = None if refresh else db.session.get(ReportSnapshot, (name, self._scope_key()))
+        if snapshot is None or snapshot.generated_at < datetime.utcnow() - self.max_age:
+            snapshot = self.build(name)
+        return vars(json.loads(snapshot.data, object_hook=_decode)), snapshot.generated_at
+
+    def build(self, name):
+        """Recompute a report for the current school scope and store it"""
+        data = json.dumps(self._builders[name](), default=_encode, separators=(',', ':'))
+        snapshot = db.session.merge(ReportSnapshot(
+            report=name, school_id=self._scope_key(), data=data, generated_at=datetime.utcnow()
+        ))
+        db.session.commit()
+        return snapshot
+
+    def generate(self, names=None):
+        """Build reports for the district and every school with scoped staff; returns snapshots built"""
+        names = names or self.scheduled
+        school_ids = db.session.scalars(
+            select(User.school_id).where(User.role.in_(SCOPED_ROLES), User.school_id.isnot(None))
+            .distinct().order_by(User.school_id)
+        ).all()
+        try:
+            for school_id in [None, *school_ids]:
+                school_scope.use(school_id)
+                for name in names:
+                    self.build(name)
+        finally:
+            g.pop('school_scope', None)
+        return (len(school_ids) + 1) * len(names)
+
+    def _scope_key(self):
+        school_id = school_scope.current()
+        return DISTRICT if school_id is None else school_id
+
+
+report_snapshots = ReportSnapshots()
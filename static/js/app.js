@@ -0,0 +1,250 @@
+// Cart functionality
+function updateCartBadge() {
+    const cartData = getCookie('cart');
+    if (cartData) {
+        try {
+            const cartItems = JSON.parse(cartData);
+            const totalItems = Object.values(cartItems).reduce((sum, quantity) => sum + quantity, 0);
+            const badge = document.getElementById('cart-badge');
+            if (totalItems > 0) {
+                badge.textContent = totalItems;
+                badge.style.display = 'inline';
+            } else {
+                badge.style.display = 'none';
+            }
+        } catch (e) {
+            console.error('Error parsing cart data:', e);
+        }
+    }
+}
+
+function getCookie(name) {
+    const value = `; ${document.cookie}`;
+    const parts = value.split(`; ${name}=`);
+    if (parts.length === 2) return parts.pop().split(';').shift();
+    return null;
+}
+
+// Update cart badge on page load
+document.addEventListener('DOMContentLoaded', function() {
+    updateCartBadge();
+
+    // Add animation classes to cards
+    const cards = document.querySelectorAll('.card');
+    cards.forEach((card, index) => {
+        card.style.animationDelay = `${index * 0.1}s`;
+        card.classList.add('animate-fade-in-up');
+    });
+});
+
+// Live updates: one EventSource per page, handlers keyed by event kind
+function subscribeToEvents(handlers) {
+    if (!window.EventSource) return null;
+    const source = new EventSource('/events/stream');
+    Object.entries(handlers).forEach(([kind, handler]) => {
+        source.addEventListener(kind, event => handler(JSON.parse(event.data)));
+    });
+    return source;
+}
+
+// Show success message function
+function showSuccessMessage(message) {
+    const alertDiv = document.createElement('div');
+    alertDiv.className = 'alert alert-success alert-dismissible fade show animate-slide-in-left';
+    alertDiv.innerHTML = `
+        ${message}
+        <button type="button" class="btn-close" data-bs-dismiss="alert"></button>
+    `;
+
+    const main = document.querySelector('main');
+    const firstChild = main.firstChild;
+    main.insertBefore(alertDiv, firstChild);
+
+    // Auto-dismiss after 3 seconds
+    setTimeout(() => {
+        alertDiv.remove();
+    }, 3000);
+}
+
+// Session timeout
+let sessionTimeout;
+const TIMEOUT_MINUTES = 5;
+const TIMEOUT_MS = TIMEOUT_MINUTES * 60 * 1000;
+let isSessionExpired = false;
+let sessionTimer;
+const SESSION_CHECK_MS = 120000;
+// One channel shared by every open tab: activity and check results are
+// broadcast so only one tab per interval asks the server.
+const sessionChannel = window.BroadcastChannel ? new BroadcastChannel('session') : null;
+let lastActivityBroadcast = 0;
+let activeSinceCheck = false;
+
+// Update session timer display
+function updateSessionTimer() {
+    const timerElement = document.getElementById('session-time');
+    if (!timerElement) return;
+
+    const now = Date.now();
+    const timeLeft = Math.max(0, Math.ceil((sessionTimeout - now) / 1000));
+    const minutes = Math.floor(timeLeft / 60);
+    const seconds = timeLeft % 60;
+
+    timerElement.textContent = `${minutes}:${seconds.toString().padStart(2, '0')}`;
+
+    // Change color based on time remaining
+    const timerContainer = document.getElementById('session-timer');
+    if (timeLeft <= 60) { // Last minute
+        timerContainer.className = 'nav-link text-danger';
+    } else if (timeLeft <= 120) { // Last 2 minutes
+        timerContainer.className = 'nav-link text-warning';
+    } else {
+        timerContainer.className = 'nav-link text-muted';
+    }
+}
+
+// Reset timeout on user activity
+function resetSessionTimeout() {
+    if (isSessionExpired) return;
+
+    clearTimeout(sessionTimeout);
+    clearInterval(sessionTimer);
+
+    const timeoutTime = Date.now() + TIMEOUT_MS;
+    sessionTimeout = timeoutTime;
+
+    sessionTimeout = setTimeout(() => {
+        isSessionExpired = true;
+        showSessionTimeoutModal();
+    }, TIMEOUT_MS);
+
+    // Start timer update
+    sessionTimer = setInterval(updateSessionTimer, 1000);
+    updateSessionTimer();
+}
+
+// Show session timeout modal
+function showSessionTimeoutModal() {
+    const modal = document.createElement('div');
+    modal.className = 'modal fade show';
+    modal.style.display = 'block';
+    modal.style.backgroundColor = 'rgba(0,0,0,0.5)';
+    modal.innerHTML = `
+        <div class="modal-dialog modal-dialog-centered">
+            <div class="modal-content">
+                <div class="modal-header bg-warning">
+                    <h5 class="modal-title">
+                        <i class="fas fa-exclamation-triangle me-2"></i>
+                        Session Timeout
+                    </h5>
+                </div>
+                <div class="modal-body">
+                    <p>Your session has expired due to inactivity. You will be logged out automatically.</p>
+                    <div class="text-center">
+                        <div class="spinner-custom" role="status">
+                            <span class="visually-hidden">Loading...</span>
+                        </div>
+                    </div>
+                </div>
+            </div>
+        </div>
+    `;
+    document.body.appendChild(modal);
+
+    // Redirect to logout after 3 seconds
+    setTimeout(() => {
+        window.location.href = '/session-timeout';
+    }, 3000);
+}
+
+// Track user activity
+function trackUserActivity() {
+    resetSessionTimeout();
+    activeSinceCheck = true;
+    if (sessionChannel && Date.now() - lastActivityBroadcast > 10000) {
+        lastActivityBroadcast = Date.now();
+        sessionChannel.postMessage({type: 'activity'});
+    }
+}
+
+function handleSessionStatus(data) {
+    if (isSessionExpired) return;
+    if (!data.valid) {
+        isSessionExpired = true;
+        showSessionTimeoutModal();
+    }
+}
+
+function checkSession() {
+    if (isSessionExpired) return;
+    // Skip if another tab checked during this interval
+    const lastCheck = parseInt(localStorage.getItem('sessionCheckedAt') || '0', 10);
+    if (Date.now() - lastCheck < SESSION_CHECK_MS - 5000) return;
+    localStorage.setItem('sessionCheckedAt', Date.now().toString());
+
+    const url = activeSinceCheck ? '/session/status?active=1' : '/session/status';
+    activeSinceCheck = false;
+    fetch(url)
+        .then(response => response.json())
+        .then(data => {
+            handleSessionStatus(data);
+            if (sessionChannel) sessionChannel.postMessage({type: 'status', data: data});
+        })
+        .catch(() => handleSessionStatus({valid: false}));
+}
+
+if (sessionChannel) {
+    sessionChannel.onmessage = event => {
+        if (event.data.type === 'activity') {
+            resetSessionTimeout();
+            activeSinceCheck = true;
+        } else if (event.data.type === 'status') {
+            handleSessionStatus(event.data.data);
+        }
+    };
+}
+
+// Initialize session timeout tracking
+document.addEventListener('DOMContentLoaded', function() {
+    // Start session timeout
+    resetSessionTimeout();
+
+    // Track various user activities
+    const events = ['mousedown', 'mousemove', 'keypress', 'scroll', 'touchstart', 'click'];
+    events.forEach(event => {
+        document.addEventListener(event, trackUserActivity, true);
+    });
+
+    // Check session validity every 2 minutes, shared across tabs
+    setInterval(checkSession, SESSION_CHECK_MS);
+});
+
+// Warn user before session expires (1 minute warning)
+setTimeout(() => {
+    if (!isSessionExpired) {
+        const warningModal = document.createElement('div');
+        warningModal.className = 'modal fade show';
+        warningModal.style.display = 'block';
+        warningModal.style.backgroundColor = 'rgba(0,0,0,0.5)';
+        warningModal.innerHTML = `
+            <div class="modal-dialog modal-dialog-centered">
+                <div class="modal-content">
+                    <div class="modal-header bg-info">
+                        <h5 class="modal-title">
+                            <i class="fas fa-info-circle me-2"></i>
+                            Session Warning
+                        </h5>
+                    </div>
+                    <div class="modal-body">
+                        <p>Your session will expire in 1 minute due to inactivity. Please continue using the application to stay logged in.</p>
+                    </div>
+                    <div class="modal-footer">
+                        <button type="button" class="btn btn-primary" onclick="this.closest('.modal').remove(); trackUserActivity();">
+                            Continue Session
+                        </button>
+                    </div>
+                </div>
+            </div>
+        `;
+        document.body.appendChild(warningModal);
+    }
+}, (TIMEOUT_MINUTES - 1) * 60 * 1000);
@@ -0,0 +1,251 @@
+"""
+Inventory bookkeeping: low-stock flag, reorder suggestions and category totals
+
+An item's threshold is its own reorder_threshold, else its category's
+CategoryThreshold, else LOW_STOCK_THRESHOLD. Inventory.below_threshold is
+recomputed before every flush that changes an item's quantity, category or
+threshold, and an item dropping below its threshold publishes a `stock_low`
+event in the same transaction. The same hook adjusts the per-category
+CategoryStock totals by the difference each change makes. Reports read the
+flag and the totals instead of scanning the inventory.
+"""
+import math
+from collections import defaultdict
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from flask import current_app
+from flask_mail import Message
+from sqlalchemy import delete, event, func, insert, inspect, select, update
+from extensions import db, mail
+from events import event_bus
+from models import User, Category, Inventory, CategoryThreshold, CategoryStock, Request, RequestItem
+from report_rows import inventory_rows, fetch
+
+TRACKED_FIELDS = ('quantity', 'category_id', 'reorder_threshold')
+VALUE_FIELDS = ('quantity', 'cost', 'category_id')
+UNCATEGORIZED = 0  # CategoryStock key for items without a category
+CONSUMED_STATUSES = ('approved', 'delivered')
+
+
+def threshold_expression(default):
+    """SQL expression for each inventory row's effective threshold"""
+    category_threshold = select(CategoryThreshold.threshold).where(
+        CategoryThreshold.category_id == Inventory.category_id
+    ).scalar_subquery()
+    return func.coalesce(Inventory.reorder_threshold, category_threshold, default)
+
+
+class StockMonitor:
+    """Keeps Inventory.below_threshold and CategoryStock current.
+
+    ORM changes are handled by a before_flush hook. Bulk loads bypass it
+    and call refresh() and rebuild_totals(); threshold changes call
+    refresh(), which fixes every stale flag with one UPDATE (without
+    publishing events).
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        if not event.contains(db.session, 'before_flush', self._before_flush):
+            event.listen(db.session, 'before_flush', self._before_flush)
+
+    def _before_flush(self, session, flush_context, instances):
+        with session.no_autoflush:
+            self._adjust_totals(session)
+            self._update_flags(session)
+
+    def _adjust_totals(self, session):
+        deltas = defaultdict(lambda: [0, 0, 0.0])
+
+        def add(category_id, quantity, cost, count):
+            delta = deltas[category_id or UNCATEGORIZED]
+            delta[0] += count
+            delta[1] += count * (quantity or 0)
+            delta[2] += count * (quantity or 0) * (cost or 0)
+
+        for item in session.new:
+            if isinstance(item, Inventory):
+                add(item.category_id, item.quantity, item.cost, 1)
+        for item in session.deleted:
+            if isinstance(item, Inventory):
+                add(item.category_id, item.quantity, item.cost, -1)
+        for item in session.dirty:
+            if not isinstance(item, Inventory):
+                continue
+            attrs = inspect(item).attrs
+            histories = [attrs[field].history for field in VALUE_FIELDS]
+            if not any(history.has_changes() for history in histories):
+                continue
+            quantity, cost, category_id = [
+                history.deleted[0] if history.deleted else getattr(item, field)
+                for field, history in zip(VALUE_FIELDS, histories)
+            ]
+            add(category_id, quantity, cost, -1)
+            add(item.category_id, item.quantity, item.cost, 1)
+
+        for category_id, (count, quantity, value) in deltas.items():
+            if not (count or quantity or value):
+                continue
+            result = session.execute(
+                update(CategoryStock.__table__)
+                .where(CategoryStock.category_id == category_id)
+                .values(item_count=CategoryStock.item_count + count,
+                        total_quantity=CategoryStock.total_quantity + quantity,
+                        total_value=CategoryStock.total_value + value)
+            )
+            if result.rowcount == 0:
+                session.execute(insert(CategoryStock.__table__).values(
+                    category_id=category_id, item_count=count, total_quantity=quantity, total_value=value
+                ))
+
+    def _update_flags(self, session):
+        changed = [
+            obj for obj in session.new if isinstance(obj, Inventory)
+        ] + [
+            obj for obj in session.dirty
+            if isinstance(obj, Inventory)
+            and any(inspect(obj).attrs[field].history.has_changes() for field in TRACKED_FIELDS)
+        ]
+        if not changed:
+            return
+
+        category_ids = {item.category_id for item in changed if item.reorder_threshold is None}
+        by_category = {}
+        if category_ids:
+            by_category = dict(session.execute(
+                select(CategoryThreshold.category_id, CategoryThreshold.threshold)
+                .where(CategoryThreshold.category_id.in_(category_ids))
+            ).all())
+        default = current_app.config['LOW_STOCK_THRESHOLD']
+
+        for item in changed:
+            threshold = item.reorder_threshold
+            if threshold is None:
+                threshold = by_category.get(item.category_id, default)
+            below = (item.quantity or 0) < threshold
+            if below and not item.below_threshold and item.id is not None:
+                event_bus.publish('stock_low', inventory_id=item.id, name=item.name,
+                                  quantity=item.quantity, threshold=threshold)
+            item.below_threshold = below
+
+    def refresh(self, connection=None):
+        """Recompute every stale flag in one statement; returns rows changed"""
+        table = Inventory.__table__
+        below = Inventory.quantity < threshold_expression(current_app.config['LOW_STOCK_THRESHOLD'])
+        statement = update(table).where(table.c.below_threshold != below).values(
+            below_threshold=below,
+            updated_at=table.c.updated_at  # a flag refresh is not an edit
+        )
+        return (connection or db.session).execute(statement).rowcount
+
+    def rebuild_totals(self, connection=None):
+        """Recompute the category totals from the inventory table"""
+        executor = connection or db.session
+        category_id = func.coalesce(Inventory.category_id, UNCATEGORIZED)
+        executor.execute(delete(CategoryStock.__table__))
+        executor.execute(insert(CategoryStock.__table__).from_select(
+            ['category_id', 'item_count', 'total_quantity', 'total_value'],
+            select(
+                category_id,
+                func.count(Inventory.id),
+                func.coalesce(func.sum(Inventory.quantity), 0),
+                func.coalesce(func.sum(Inventory.stock_value), 0)
+            ).group_by(category_id)
+        ))
+
+    def category_totals(self):
+        """Running totals of the categories that have items, by name"""
+        return db.session.query(
+            Category.name.label('category'),
+            CategoryStock.item_count,
+            CategoryStock.total_quantity,
+            CategoryStock.total_value
+        ).select_from(CategoryStock).outerjoin(
+            Category, Category.id == CategoryStock.category_id
+        ).filter(CategoryStock.item_count > 0).order_by(Category.name).all()
+
+    def category_names(self):
+        """Names of the categories that have items, for filter dropdowns"""
+        return [row.category for row in self.category_totals() if row.category]
+
+    def set_category_threshold(self, category_id, threshold):
+        """Set (or with None, clear) a category's threshold and refresh the flags"""
+        existing = db.session.get(CategoryThreshold, category_id)
+        if threshold is None:
+            if existing is not None:
+                db.session.delete(existing)
+        elif existing is None:
+            db.session.add(CategoryThreshold(category_id=category_id, threshold=threshold))
+        else:
+            existing.threshold = threshold
+        db.session.flush()
+        return self.refresh()
+
+    def low_stock(self):
+        """Items below their threshold, emptiest first, with reorder suggestions.
+
+        Usage is what approved and delivered requests took over the last
+        STOCK_VELOCITY_DAYS; the suggested order restores the threshold plus
+        REORDER_COVER_DAYS of that usage.
+        """
+        config = current_app.config
+        rows = fetch(inventory_rows(
+            threshold_expression(config['LOW_STOCK_THRESHOLD']).label('threshold')
+        ).where(Inventory.below_threshold.is_(True)).order_by(Inventory.quantity.asc()))
+        if not rows:
+            return []
+
+        days = config['STOCK_VELOCITY_DAYS']
+        since = datetime.utcnow() - timedelta(days=days)
+        # Stock is shared by the district: count every school's usage, not
+        # only the school of the admin looking (see scoping.py)
+        consumed = dict(db.session.query(
+            RequestItem.inventory_id, func.sum(RequestItem.quantity)
+        ).join(Request, Request.id == RequestItem.request_id).filter(
+            RequestItem.inventory_id.in_([item.id for item in rows]),
+            Request.status.in_(CONSUMED_STATUSES),
+            Request.created_at >= since
+        ).group_by(RequestItem.inventory_id).execution_options(unscoped=True).all())
+
+        entries = []
+        for item in rows:
+            daily_usage = (consumed.get(item.id) or 0) / days
+            target = item.threshold + math.ceil(daily_usage * config['REORDER_COVER_DAYS'])
+            entries.append(SimpleNamespace(
+                item=item,
+                threshold=item.threshold,
+                daily_usage=round(daily_usage, 2),
+                days_left=max(item.quantity, 0) / daily_usage if daily_usage else None,
+                reorder_quantity=max(target - item.quantity, 0)
+            ))
+        return entries
+
+    def send_digest(self):
+        """Email active admins the low-stock list; returns the number of items"""
+        entries = self.low_stock()
+        recipients = [email for (email,) in db.session.query(User.email).filter(
+            User.role.in_(('admin', 'super_admin')), User.is_active.is_(True)
+        )]
+        if not entries or not recipients:
+            return 0
+
+        lines = []
+        for entry in entries:
+            line = (f'{entry.item.name} ({entry.item.category or "Uncategorized"}): '
+                    f'{entry.item.quantity} left, threshold {entry.threshold}, '
+                    f'reorder {entry.reorder_quantity}')
+            if entry.days_left is not None:
+                line += f' (about {entry.days_left:.0f} days of stock at current usage)'
+            lines.append(line)
+        mail.send(Message(
+            f'Low stock: {len(entries)} items below threshold',
+            recipients=recipients,
+            body='\n'.join(lines)
+        ))
+        return len(entries)
+
+
+stock_monitor = StockMonitor()
@@ -0,0 +1,56 @@
+import pytest
+from app import create_app
+from extensions import db
+from models import User, Inventory, Request, RequestItem, Comment
+
+PASSWORD = 'secret123'
+
+
+def seed(requests=20, users=10, items=5, comments=3):
+    """Requests spread over several requesters, each with lines and comments.
+
+    Enough distinct users and rows that a per-row lazy load shows up as a
+    query count that grows with the data.
+    """
+    requesters = []
+    for number in range(users):
+        user = User(username=f'teacher{number}', email=f'teacher{number}@school.com', role='user')
+        user.set_password(PASSWORD)
+        requesters.append(user)
+    stock = [Inventory(name=f'Item {number}', quantity=100, cost=2.5) for number in range(items)]
+    db.session.add_all(requesters + stock)
+    db.session.flush()
+
+    for number in range(requests):
+        requester = requesters[number % users]
+        request = Request(user_id=requester.id, status='pending', total_cost=5.0)
+        db.session.add(request)
+        db.session.flush()
+        db.session.add_all(
+            RequestItem(request_id=request.id, inventory_id=item.id, quantity=1, cost=item.cost)
+            for item in stock[:2]
+        )
+        db.session.add_all(
+            Comment(request_id=request.id, user_id=requesters[(number + offset) % users].id,
+                    comment=f'Comment {offset}')
+            for offset in range(comments)
+        )
+    db.session.commit()
+
+
+@pytest.fixture(scope='session')
+def app():
+    app = create_app('testing')
+    with app.app_context():
+        seed()
+    return app
+
+
+@pytest.fixture
+def admin_client(app):
+    """A client signed in as the super admin init_database creates"""
+    client = app.test_client()
+    client.post('/login', data={'username': 'admin', 'password': 'admin123'})
+    # Budgets count requests from a signed-in user whose identity is cached
+    client.get('/check-session')
+    return client
@@ -0,0 +1,45 @@
+"""
+Query budgets for pages that list many rows
+
+The budgets don't grow with the seeded data, so a relationship that starts
+lazy-loading once per row fails here instead of in production.
+"""
+import pytest
+from query_stats import query_stats
+
+
+def test_comments_api(admin_client):
+    with query_stats.assert_max_queries(3):
+        response = admin_client.get('/request/1/comments')
+    assert response.status_code == 200
+    assert len(response.get_json()['comments']) == 3
+
+
+def test_request_detail_page(admin_client):
+    with query_stats.assert_max_queries(3):
+        response = admin_client.get('/request/1/view')
+    assert response.status_code == 200
+
+
+def test_admin_requests(admin_client):
+    with query_stats.assert_max_queries(2):
+        response = admin_client.get('/admin/requests')
+    assert response.status_code == 200
+    assert b'teacher9' in response.data
+
+
+@pytest.mark.parametrize('url, budget', [
+    ('/reports', 9),
+    ('/reports/summary', 13),
+    ('/reports/daily-transactions', 2),
+    ('/reports/stock-report', 4),
+    ('/reports/sales-report', 9),
+    ('/reports/pending-report', 4),
+    ('/reports/user-summary', 3),
+    ('/reports/inventory-sales-summary', 7),
+    ('/reports/analytics', 5),
+])
+def test_reports(admin_client, url, budget):
+    with query_stats.assert_max_queries(budget):
+        response = admin_client.get(url)
+    assert response.status_code == 200
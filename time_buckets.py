@@ -0,0 +1,93 @@
+"""
+Calendar time buckets for trend reports
+
+Requests are grouped by year-month, ISO week or day with a CASE over the
+bucket boundaries, and the window itself is a plain range on
+Request.created_at, so the created_at index is used and months from
+different years never collapse together. Buckets without requests are
+zero-filled.
+"""
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from sqlalchemy import case
+from extensions import db
+from models import Request
+
+
+def bucket_start(moment, unit):
+    """Start of the month, ISO week (Monday) or day containing `moment`"""
+    day = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    if unit == 'month':
+        return day.replace(day=1)
+    if unit == 'week':
+        return day - timedelta(days=day.weekday())
+    if unit == 'day':
+        return day
+    raise ValueError(f'Unknown time bucket unit: {unit}')
+
+
+def next_bucket(start, unit):
+    if unit == 'month':
+        return start.replace(year=start.year + start.month // 12, month=start.month % 12 + 1)
+    return start + timedelta(days=7 if unit == 'week' else 1)
+
+
+def bucket_label(start, unit):
+    if unit == 'month':
+        return start.strftime('%b %Y')
+    if unit == 'week':
+        return f'Week of {start.strftime("%Y-%m-%d")}'
+    return start.strftime('%Y-%m-%d')
+
+
+def last_buckets(count, unit='month', now=None):
+    """(start, end) covering the current bucket and the `count - 1` before it"""
+    end = next_bucket(bucket_start(now or datetime.utcnow(), unit), unit)
+    start = end
+    for _ in range(count):
+        start = bucket_start(start - timedelta(days=1), unit)
+    return start, end
+
+
+def bucket_bounds(start, end, unit='month'):
+    bounds = []
+    current = bucket_start(start, unit)
+    while current < end:
+        following = next_bucket(current, unit)
+        bounds.append((current, following))
+        current = following
+    return bounds
+
+
+def time_buckets(measures, start, end, unit='month', filters=()):
+    """Aggregate requests created in [start, end) per calendar bucket.
+
+    `measures` maps output names to aggregate expressions, e.g.
+    {'count': func.count(Request.id), 'total_cost': func.sum(Request.total_cost)}.
+    Returns one object per bucket, oldest first, with `label`, `start`,
+    `end` and each measure (0 for empty buckets).
+    """
+    bounds = bucket_bounds(start, end, unit)
+    if not bounds:
+        return []
+    bucket = case(
+        *[(Request.created_at < bucket_end, index) for index, (_, bucket_end) in enumerate(bounds[:-1])],
+        else_=len(bounds) - 1
+    ).label('bucket')
+    rows = db.session.query(
+        bucket, *[expression.label(name) for name, expression in measures.items()]
+    ).filter(
+        Request.created_at >= bounds[0][0], Request.created_at < bounds[-1][1], *filters
+    ).group_by(bucket).all()
+
+    totals = {row.bucket: row for row in rows}
+    buckets = []
+    for index, (bucket_from, bucket_to) in enumerate(bounds):
+        row = totals.get(index)
+        buckets.append(SimpleNamespace(
+            label=bucket_label(bucket_from, unit),
+            start=bucket_from,
+            end=bucket_to,
+            **{name: (getattr(row, name) or 0) if row else 0 for name in measures}
+        ))
+    return buckets